@@ -0,0 +1,194 @@
+"""Message Batches execution for non-urgent scheduled runs."""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import os
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from agent.storage import Counters
+
+# Scheduled runs of tasks repeating at least this rarely are sent through the
+# Batches API (half the price, no interactive latency) instead of
+# messages.create. Manual runs never are. Set COSN_BATCHES=0 to disable.
+BATCHES_ENABLED = os.getenv("COSN_BATCHES", "1") != "0"
+BATCH_MIN_INTERVAL = 6 * 3600  # seconds
+
+# Due runs are collected for BATCH_WINDOW seconds (or until BATCH_MAX_REQUESTS
+# are waiting) and submitted together, one batch per API key.
+BATCH_WINDOW = float(os.getenv("COSN_BATCH_WINDOW", "30"))
+BATCH_MAX_REQUESTS = 100
+POLL_INTERVAL = float(os.getenv("COSN_BATCH_POLL", "60"))
+
+
+class BatchError(Exception):
+    """A batched request errored, expired or was cancelled."""
+
+
+def is_batchable(task: Dict[str, Any], manual: bool) -> bool:
+    return BATCHES_ENABLED and not manual and task.get("interval", 0) >= BATCH_MIN_INTERVAL
+
+
+# ── Client ────────────────────────────────────────────────────────────────────
+
+def _anthropic_client(api_key: str) -> Any:
+    from agent.llm_clients import get_async_client
+    return get_async_client(api_key)
+
+
+_client_factory: Callable[[str], Any] = _anthropic_client
+
+
+def set_client_factory(factory: Optional[Callable[[str], Any]]) -> None:
+    """
+    Swap the client batches are sent through — e.g. LocalBatchClient for
+    offline runs. The factory takes the API key and returns an object with an
+    async messages.batches.create / retrieve / results API. None restores
+    the real Anthropic client.
+    """
+    global _client_factory
+    _client_factory = factory or _anthropic_client
+
+
+class LocalBatchClient:
+    """
+    In-process stand-in for the Message Batches API. A batch "ends" `latency`
+    seconds after creation; each request is answered by responder(params),
+    which returns the draft text or raises to mark the request errored.
+    """
+
+    def __init__(
+        self, responder: Optional[Callable[[Dict[str, Any]], str]] = None, latency: float = 0.0,
+    ) -> None:
+        self.messages = SimpleNamespace(batches=self)
+        self._responder = responder or (lambda params: f"[local batch draft — {params['model']}]")
+        self._latency = latency
+        self._batches: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+        self._ids = itertools.count(1)
+
+    def __call__(self, api_key: str) -> "LocalBatchClient":
+        return self  # usable directly as a client factory
+
+    def _batch(self, batch_id: str) -> SimpleNamespace:
+        created, requests = self._batches[batch_id]
+        ended = time.monotonic() - created >= self._latency
+        return SimpleNamespace(
+            id=batch_id,
+            processing_status="ended" if ended else "in_progress",
+            request_counts=SimpleNamespace(processing=0 if ended else len(requests)),
+        )
+
+    async def create(self, requests: List[Dict[str, Any]]) -> SimpleNamespace:
+        batch_id = f"msgbatch_local_{next(self._ids)}"
+        self._batches[batch_id] = (time.monotonic(), requests)
+        return self._batch(batch_id)
+
+    async def retrieve(self, message_batch_id: str) -> SimpleNamespace:
+        return self._batch(message_batch_id)
+
+    async def results(self, message_batch_id: str) -> Any:
+        _, requests = self._batches[message_batch_id]
+
+        async def entries():
+            for req in requests:
+                try:
+                    text = self._responder(req["params"])
+                except Exception as exc:
+                    result = SimpleNamespace(type="errored", error=str(exc))
+                else:
+                    usage = SimpleNamespace(input_tokens=0, output_tokens=0)
+                    message = SimpleNamespace(content=[SimpleNamespace(text=text)], usage=usage)
+                    result = SimpleNamespace(type="succeeded", message=message)
+                yield SimpleNamespace(custom_id=req["custom_id"], result=result)
+
+        return entries()
+
+
+# ── Collector ─────────────────────────────────────────────────────────────────
+# Everything below runs on the agent loop (agent.loop); only the counters are
+# read from other threads.
+
+_waiting: Dict[str, List[Tuple[str, Dict[str, Any], asyncio.Future]]] = {}  # api_key → requests
+_flush_handles: Dict[str, asyncio.TimerHandle] = {}
+_tasks: set = set()
+_ids = itertools.count(1)
+_counters = Counters("batches", "requests", "in_flight", "succeeded", "failed")
+
+
+def enqueue(api_key: str, params: Dict[str, Any]) -> asyncio.Future:
+    """
+    Add one Messages API request to the next batch for `api_key`. Returns a
+    future resolving to (text, usage) once the batch has ended, or failing
+    with BatchError. Must be called on the agent loop.
+    """
+    loop = asyncio.get_running_loop()
+    fut = loop.create_future()
+    queue = _waiting.setdefault(api_key, [])
+    queue.append((f"run-{next(_ids)}", params, fut))
+
+    if len(queue) >= BATCH_MAX_REQUESTS:
+        handle = _flush_handles.pop(api_key, None)
+        if handle:
+            handle.cancel()
+        _start_flush(api_key)
+    elif api_key not in _flush_handles:
+        _flush_handles[api_key] = loop.call_later(BATCH_WINDOW, _start_flush, api_key)
+    return fut
+
+
+def _start_flush(api_key: str) -> None:
+    _flush_handles.pop(api_key, None)
+    requests = _waiting.pop(api_key, [])
+    if requests:
+        task = asyncio.get_running_loop().create_task(_submit_and_poll(api_key, requests))
+        _tasks.add(task)
+        task.add_done_callback(_tasks.discard)
+
+
+async def _submit_and_poll(
+    api_key: str, requests: List[Tuple[str, Dict[str, Any], asyncio.Future]],
+) -> None:
+    from agent.claude import usage_of
+
+    waiters = {custom_id: fut for custom_id, _, fut in requests}
+    _counters.bump(batches=1, requests=len(requests), in_flight=1)
+    try:
+        client = _client_factory(api_key)
+        batch = await client.messages.batches.create(
+            requests=[{"custom_id": cid, "params": params} for cid, params, _ in requests],
+        )
+        while batch.processing_status != "ended":
+            await asyncio.sleep(POLL_INTERVAL)
+            batch = await client.messages.batches.retrieve(batch.id)
+
+        async for entry in await client.messages.batches.results(batch.id):
+            fut = waiters.pop(entry.custom_id, None)
+            if fut is None or fut.done():
+                continue
+            if entry.result.type == "succeeded":
+                message = entry.result.message
+                fut.set_result((message.content[0].text, usage_of(message)))
+                _counters.bump(succeeded=1)
+            else:
+                detail = getattr(entry.result, "error", "") or ""
+                fut.set_exception(BatchError(f"batched request {entry.result.type} {detail}".strip()))
+                _counters.bump(failed=1)
+        for fut in waiters.values():
+            if not fut.done():
+                fut.set_exception(BatchError("no result returned for batched request"))
+                _counters.bump(failed=1)
+    except Exception as exc:
+        for fut in waiters.values():
+            if not fut.done():
+                fut.set_exception(exc)
+                _counters.bump(failed=1)
+    finally:
+        _counters.bump(in_flight=-1)
+
+
+def batch_stats() -> Dict[str, int]:
+    stats = _counters.snapshot()
+    stats["waiting"] = sum(len(q) for q in list(_waiting.values()))
+    return stats
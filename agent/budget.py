@@ -0,0 +1,115 @@
+"""Token budget for the assembled context — measure each section and trim to fit."""
+from __future__ import annotations
+
+import math
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+# Input tokens a task may send by default: the 200k context window less room
+# for the system prompt, the response and estimator error.
+DEFAULT_INPUT_BUDGET = 150_000
+
+# Local estimator: English prose averages ~4 characters per token; 3.5 errs
+# on the side of over-counting so trimmed prompts still fit.
+CHARS_PER_TOKEN = 3.5
+
+# Also ask the token-count endpoint for the exact total of the final prompt
+# (one extra round trip per run). Per-section counts stay local either way.
+COUNT_WITH_API = os.getenv("COSN_TOKEN_COUNT_API", "0") == "1"
+
+# Lower numbers are filled first; sections sharing a priority split what is
+# left evenly, so one huge document cannot starve the others.
+PRIORITY_TEMPLATE = 0   # template + instructions — never trimmed
+PRIORITY_DATA = 1       # live source data
+PRIORITY_DOCS = 2       # uploaded context documents
+
+POLICY_KEEP = "keep"          # always sent in full, even over budget
+POLICY_TRUNCATE = "truncate"  # cut at a line boundary to its share
+POLICY_DROP = "drop"          # sent whole or not at all
+
+TRUNCATION_NOTE = "\n[… truncated to fit the token budget]"
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, tokens: int) -> str:
+    """Keep the head of `text` within `tokens`, cut at the last full line."""
+    limit = int(tokens * CHARS_PER_TOKEN) - len(TRUNCATION_NOTE)
+    if limit <= 0:
+        return ""
+    if len(text) <= limit:
+        return text
+    head = text[:limit]
+    cut = head.rfind("\n")
+    return (head[:cut] if cut > 0 else head).rstrip() + TRUNCATION_NOTE
+
+
+@dataclass
+class Section:
+    name: str
+    text: str
+    priority: int
+    policy: str = POLICY_TRUNCATE
+    tokens: int = 0
+    kept_tokens: int = 0
+    action: str = "kept"
+
+
+def plan(sections: List[Section], budget: int) -> Dict[str, Any]:
+    """
+    Fit `sections` into `budget` tokens, trimming their .text in place.
+    Returns the per-section breakdown reported with the run.
+    """
+    for s in sections:
+        s.tokens = estimate_tokens(s.text)
+
+    remaining = budget
+    for priority in sorted({s.priority for s in sections}):
+        group = [s for s in sections if s.priority == priority]
+        fixed = [s for s in group if s.policy == POLICY_KEEP]
+        for s in fixed:
+            remaining -= s.tokens
+        # Water-fill the rest: smallest first, each gets at most an even share.
+        flexible = sorted((s for s in group if s.policy != POLICY_KEEP), key=lambda s: s.tokens)
+        for i, s in enumerate(flexible):
+            share = max(0, remaining) // (len(flexible) - i)
+            if s.tokens <= share:
+                pass
+            elif s.policy == POLICY_TRUNCATE and share > 0:
+                s.text = truncate_to_tokens(s.text, share)
+                s.action = "truncated" if s.text else "dropped"
+            else:
+                s.text = ""
+                s.action = "dropped"
+            s.kept_tokens = estimate_tokens(s.text)
+            remaining -= s.kept_tokens
+        for s in fixed:
+            s.kept_tokens = s.tokens
+
+    total = sum(s.kept_tokens for s in sections)
+    return {
+        "budget":          budget,
+        "estimated_total": total,
+        "over_budget":     total > budget,
+        "sections": [
+            {"section": s.name, "priority": s.priority, "tokens": s.tokens,
+             "kept_tokens": s.kept_tokens, "action": s.action}
+            for s in sections
+        ],
+    }
+
+
+async def count_tokens(api_key: str, params: Dict[str, Any]) -> Optional[int]:
+    """Exact input tokens for a Messages request, or None if counting fails."""
+    from agent.llm_clients import get_async_client
+
+    try:
+        result = await get_async_client(api_key).messages.count_tokens(
+            model=params["model"], system=params["system"], messages=params["messages"],
+        )
+    except Exception:
+        return None
+    return result.input_tokens
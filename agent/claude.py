@@ -1,5 +1,8 @@
 """Claude API integration — streaming generation."""
-import anthropic
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from agent.llm_clients import get_async_client, get_client
 
 SYSTEM_PROMPT = """\
 You are a professional content writer for the Chief of Staff Network (CoSN), \
@@ -14,12 +17,56 @@ Rules:
 - Write in second person for calls-to-action ("join us", "register now").\
 """
 
+DEFAULT_MAX_TOKENS = 4096
+
+# Mark the system prompt and the stable context blocks (agent.context.
+# assemble_blocks) for prompt caching. Set COSN_PROMPT_CACHE=0 to send
+# everything uncached.
+PROMPT_CACHING = os.getenv("COSN_PROMPT_CACHE", "1") != "0"
+
+Prompt = Union[str, List[Dict[str, Any]]]
+
+
+def _system() -> Union[str, List[Dict[str, Any]]]:
+    if not PROMPT_CACHING:
+        return SYSTEM_PROMPT
+    return [{"type": "text", "text": SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}]
+
+
+def _content(context: Prompt) -> Prompt:
+    """User content: a plain string, or text blocks (cache marks dropped if caching is off)."""
+    if isinstance(context, str) or PROMPT_CACHING:
+        return context
+    return [{k: v for k, v in block.items() if k != "cache_control"} for block in context]
+
+
+def request_params(
+    context: Prompt, model: str, max_tokens: int = DEFAULT_MAX_TOKENS,
+) -> Dict[str, Any]:
+    """Messages API parameters for one draft — shared by direct calls and batches."""
+    return {
+        "model":      model,
+        "max_tokens": max_tokens,
+        "system":     _system(),
+        "messages":   [{"role": "user", "content": _content(context)}],
+    }
+
+
+def usage_of(message: Any) -> Dict[str, int]:
+    u = message.usage
+    return {
+        "input_tokens":                u.input_tokens,
+        "output_tokens":               u.output_tokens,
+        "cache_read_input_tokens":     getattr(u, "cache_read_input_tokens", None) or 0,
+        "cache_creation_input_tokens": getattr(u, "cache_creation_input_tokens", None) or 0,
+    }
+
 
 def stream_generation(
     api_key: str,
-    context: str,
+    context: Prompt,
     model: str = "claude-sonnet-4-6",
-    max_tokens: int = 4096,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
 ):
     """
     Generator that yields text chunks from the Claude streaming API.
@@ -27,33 +74,50 @@ def stream_generation(
         for chunk in stream_generation(api_key, context, model):
             ...
     """
-    client = anthropic.Anthropic(api_key=api_key)
-    with client.messages.stream(
-        model=model,
-        max_tokens=max_tokens,
-        system=SYSTEM_PROMPT,
-        messages=[{"role": "user", "content": context}],
-    ) as stream:
+    client = get_client(api_key)
+    with client.messages.stream(**request_params(context, model, max_tokens)) as stream:
         yield from stream.text_stream
 
 
 def generate_text(
     api_key: str,
-    context: str,
+    context: Prompt,
     model: str = "claude-sonnet-4-6",
-    max_tokens: int = 4096,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
 ) -> str:
-    """Non-streaming generation — used by background task runner."""
-    client = anthropic.Anthropic(api_key=api_key)
-    message = client.messages.create(
-        model=model,
-        max_tokens=max_tokens,
-        system=SYSTEM_PROMPT,
-        messages=[{"role": "user", "content": context}],
-    )
+    """Blocking, non-streaming generation (the runner uses agenerate)."""
+    client = get_client(api_key)
+    message = client.messages.create(**request_params(context, model, max_tokens))
     return message.content[0].text
 
 
+async def agenerate(
+    api_key: str,
+    context: Prompt,
+    model: str = "claude-sonnet-4-6",
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    on_text: Optional[Callable[[str], None]] = None,
+) -> Tuple[str, Dict[str, int]]:
+    """
+    Async generation — returns (text, token usage incl. prompt-cache reads/writes).
+    on_text: if given, the response is streamed and each text chunk is passed
+             to it as it arrives.
+    """
+    client = get_async_client(api_key)
+    params = request_params(context, model, max_tokens)
+    if on_text is None:
+        message = await client.messages.create(**params)
+        return message.content[0].text, usage_of(message)
+
+    chunks: List[str] = []
+    async with client.messages.stream(**params) as stream:
+        async for text in stream.text_stream:
+            chunks.append(text)
+            on_text(text)
+        message = await stream.get_final_message()
+    return "".join(chunks), usage_of(message)
+
+
 AVAILABLE_MODELS = [
     "claude-sonnet-4-6",
     "claude-opus-4-6",
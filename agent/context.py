@@ -1,7 +1,7 @@
-"""Assemble the full Claude context string from all sources."""
+"""Assemble the full Claude context from all sources — as cacheable blocks or one string."""
 from __future__ import annotations
 
-from typing import Dict, Optional
+from typing import Any, Collection, Dict, List, Optional
 
 TASK_INSTRUCTION = """\
 Using the data above and following the template exactly, generate the \
@@ -10,18 +10,46 @@ with no further editing needed.\
 """
 
 
-def assemble_context(
+def assemble_blocks(
     luma_text: str = "",
     spotify_text: str = "",
     webflow_text: str = "",
     blogs_text: str = "",
     uploaded_docs: Optional[Dict[str, str]] = None,
     template_text: str = "",
-) -> str:
+    extra_sections: Optional[List[str]] = None,
+    summarized_docs: Optional[Collection[str]] = None,
+    task_instruction: str = TASK_INSTRUCTION,
+) -> List[Dict[str, Any]]:
     """
-    Build the full prompt context string per PRD §6.2.
+    Build the prompt as Messages API text blocks, stable parts first.
+
+    The uploaded documents and the template rarely change between runs of a
+    task, so they lead and carry cache_control (prompt caching caches the
+    prefix up to each marked block). The live data and the task instruction
+    change every run and come last, uncached.
+    extra_sections: normalized text from plugin sources without a dedicated slot.
+    summarized_docs: names of uploaded_docs whose text is a stored summary
+                     (agent.summaries) rather than the document itself.
+    task_instruction: closes the data block (section-parallel runs ask for
+                      the draft one section at a time).
     """
-    parts: list[str] = []
+    # Uploaded documents block
+    docs: list[str] = ["=== UPLOADED DOCUMENTS ==="]
+    if uploaded_docs:
+        for filename, text in uploaded_docs.items():
+            label = f"{filename} (summary)" if filename in (summarized_docs or ()) else filename
+            docs.append(f"--- {label} ---")
+            docs.append(text.strip())
+    else:
+        docs.append("(No additional documents uploaded.)")
+
+    # Template block
+    template: list[str] = ["=== TEMPLATE & INSTRUCTIONS ==="]
+    if template_text.strip():
+        template.append(template_text.strip())
+    else:
+        template.append("(No template provided — use a standard content format.)")
 
     # Data context block
     data_sections: list[str] = []
@@ -33,32 +61,35 @@ def assemble_context(
         data_sections.append(webflow_text.strip())
     if blogs_text.strip():
         data_sections.append(blogs_text.strip())
+    for text in extra_sections or []:
+        if text.strip():
+            data_sections.append(text.strip())
 
+    data: list[str] = ["=== DATA CONTEXT ==="]
     if data_sections:
-        parts.append("=== DATA CONTEXT ===")
-        parts.append("\n\n".join(data_sections))
+        data.append("\n\n".join(data_sections))
     else:
-        parts.append("=== DATA CONTEXT ===")
-        parts.append("(No live data fetched — work from uploaded documents and template only.)")
+        data.append("(No live data fetched — work from uploaded documents and template only.)")
 
-    # Uploaded documents block
-    parts.append("\n=== UPLOADED DOCUMENTS ===")
-    if uploaded_docs:
-        for filename, text in uploaded_docs.items():
-            parts.append(f"--- {filename} ---")
-            parts.append(text.strip())
-    else:
-        parts.append("(No additional documents uploaded.)")
+    # Task instruction
+    data.append("\n=== YOUR TASK ===")
+    data.append(task_instruction)
 
-    # Template block
-    parts.append("\n=== TEMPLATE & INSTRUCTIONS ===")
-    if template_text.strip():
-        parts.append(template_text.strip())
-    else:
-        parts.append("(No template provided — use a standard content format.)")
+    return [
+        {"type": "text", "text": "\n\n".join(docs), "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": "\n\n".join(template), "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": "\n\n".join(data)},
+    ]
+
+
+def blocks_text(blocks: List[Dict[str, Any]]) -> str:
+    """The blocks as one prompt string."""
+    return "\n\n".join(b["text"] for b in blocks)
 
-    # Task instruction
-    parts.append("\n=== YOUR TASK ===")
-    parts.append(TASK_INSTRUCTION)
 
-    return "\n\n".join(parts)
+def assemble_context(**sections: Any) -> str:
+    """
+    Build the full prompt context string per PRD §6.2 (same order as
+    assemble_blocks). Takes assemble_blocks' keyword arguments.
+    """
+    return blocks_text(assemble_blocks(**sections))
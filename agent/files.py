@@ -1,19 +1,31 @@
 """Uploaded file text extraction — supports .docx, .txt, .md."""
+import hashlib
 import io
-from typing import Any
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
 import mammoth
 
+# Extracted text is cached by SHA-256 of the file bytes, so a document is
+# parsed once however many runs use it. Least-recently-used entries leave
+# memory past EXTRACT_CACHE_BYTES; with EXTRACT_CACHE_DISK on they are also
+# kept under the cache directory and survive restarts.
+EXTRACT_CACHE_BYTES = int(os.getenv("COSN_EXTRACT_CACHE_MB", "64")) * 1024 * 1024
+EXTRACT_CACHE_DISK = os.getenv("COSN_EXTRACT_CACHE_DISK", "1") != "0"
+EXTRACT_CACHE_DIR = Path(os.getenv("COSN_CACHE_DIR", ".cache")) / "extracted"
+
+_cache: "OrderedDict[str, str]" = OrderedDict()
+_cache_bytes = 0
+_stats: Dict[str, int] = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+_lock = threading.Lock()
 
-def extract_text(uploaded_file: Any) -> str:
-    """
-    Extract plain text from a Streamlit UploadedFile object.
-    Supports: .docx, .txt, .md
-    """
-    name = uploaded_file.name.lower()
-    raw_bytes = uploaded_file.read()
-    uploaded_file.seek(0)  # reset for any subsequent reads
 
-    if name.endswith(".docx"):
+def parse_bytes(name: str, raw_bytes: bytes) -> str:
+    """Extract without the cache. Module-level so it can run in a worker process."""
+    if name.lower().endswith(".docx"):
         result = mammoth.extract_raw_text(io.BytesIO(raw_bytes))
         return result.value.strip()
 
@@ -24,6 +36,112 @@ def extract_text(uploaded_file: Any) -> str:
         return raw_bytes.decode("latin-1").strip()
 
 
+def _cache_key(name: str, raw_bytes: bytes) -> str:
+    # The same bytes extract differently as .docx and as plain text.
+    kind = "docx" if name.lower().endswith(".docx") else "text"
+    return f"{kind}-{hashlib.sha256(raw_bytes).hexdigest()}"
+
+
+def _remember(key: str, text: str) -> None:
+    """Caller holds _lock."""
+    global _cache_bytes
+    if key in _cache:
+        return
+    _cache[key] = text
+    _cache_bytes += len(text)
+    while _cache_bytes > EXTRACT_CACHE_BYTES and len(_cache) > 1:
+        _, old = _cache.popitem(last=False)
+        _cache_bytes -= len(old)
+        _stats["evictions"] += 1
+
+
+def _disk_path(key: str) -> Path:
+    return EXTRACT_CACHE_DIR / key[:8] / f"{key}.txt"
+
+
+def _load_disk(key: str) -> Optional[str]:
+    if not EXTRACT_CACHE_DISK:
+        return None
+    try:
+        return _disk_path(key).read_text(encoding="utf-8")
+    except OSError:
+        return None
+
+
+def _store_disk(key: str, text: str) -> None:
+    if not EXTRACT_CACHE_DISK:
+        return
+    path = _disk_path(key)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        pass  # a read-only or full disk just means no persistence
+
+
+def cached_text(name: str, raw_bytes: bytes) -> Tuple[str, Optional[str]]:
+    """(cache key, extracted text or None) — memory first, then disk."""
+    key = _cache_key(name, raw_bytes)
+    with _lock:
+        text = _cache.get(key)
+        if text is not None:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+            return key, text
+
+    text = _load_disk(key)
+    with _lock:
+        if text is None:
+            _stats["misses"] += 1
+        else:
+            _stats["disk_hits"] += 1
+            _remember(key, text)
+    return key, text
+
+
+def store_text(key: str, text: str) -> None:
+    """Cache freshly extracted text under the key cached_text() returned."""
+    _store_disk(key, text)
+    with _lock:
+        _remember(key, text)
+
+
+def extract_bytes(name: str, raw_bytes: bytes) -> str:
+    """Extract plain text from file bytes, parsing each distinct file only once."""
+    key, text = cached_text(name, raw_bytes)
+    if text is None:
+        text = parse_bytes(name, raw_bytes)
+        store_text(key, text)
+    return text
+
+
+def extraction_cache_stats() -> Dict[str, int]:
+    with _lock:
+        return {**_stats, "entries": len(_cache), "bytes": _cache_bytes}
+
+
+def clear_extraction_cache() -> None:
+    """Empty the in-memory cache and delete persisted text."""
+    global _cache_bytes
+    import shutil
+    shutil.rmtree(EXTRACT_CACHE_DIR, ignore_errors=True)
+    with _lock:
+        _cache.clear()
+        _cache_bytes = 0
+
+
+def extract_text(uploaded_file: Any) -> str:
+    """
+    Extract plain text from a Streamlit UploadedFile object.
+    Supports: .docx, .txt, .md
+    """
+    raw_bytes = uploaded_file.read()
+    uploaded_file.seek(0)  # reset for any subsequent reads
+    return extract_bytes(uploaded_file.name, raw_bytes)
+
+
 def extract_all(uploaded_files: list) -> dict[str, str]:
     """
     Extract text from all uploaded files.
@@ -0,0 +1,118 @@
+"""Content-addressed cache of generated drafts, so identical inputs skip Claude."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+from typing import Any, Dict, Optional, Tuple
+
+from agent.storage import Counters, SqliteStore
+
+# Least-recently-used drafts are evicted past either limit.
+MAX_ENTRIES = int(os.getenv("COSN_GEN_CACHE_ENTRIES", "500"))
+MAX_BYTES = int(os.getenv("COSN_GEN_CACHE_MB", "50")) * 1024 * 1024
+
+# Per-task policy (task["generation_cache"]).
+POLICY_ALWAYS = "always"        # always call Claude; the draft is still stored
+POLICY_IDENTICAL = "identical"  # reuse a stored draft for identical inputs
+POLICY_TTL = "ttl"              # reuse only if younger than task["generation_cache_ttl"]
+POLICIES = (POLICY_ALWAYS, POLICY_IDENTICAL, POLICY_TTL)
+DEFAULT_TTL = 3600  # seconds
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS generations (
+    key        TEXT    PRIMARY KEY,
+    model      TEXT    NOT NULL,
+    output     TEXT    NOT NULL,
+    size       INTEGER NOT NULL,
+    created_at REAL    NOT NULL,
+    used_at    REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS generations_by_use ON generations (used_at);
+"""
+
+_store = SqliteStore("generations.sqlite3", _SCHEMA)
+_counters = Counters("hits", "misses", "stores", "evictions")
+
+
+def generation_key(model: str, system: str, context: str, max_tokens: int, variant: str = "") -> str:
+    """
+    Hash of everything that determines the request Claude sees.
+    variant: how the draft is generated, when not one plain request.
+    """
+    raw = json.dumps([model, system, context, max_tokens] + ([variant] if variant else []))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def lookup(key: str, policy: str, ttl: Optional[float] = None) -> Optional[Tuple[str, float]]:
+    """Return (draft, age in seconds) if `policy` allows reusing a stored draft."""
+    if policy not in (POLICY_IDENTICAL, POLICY_TTL):
+        return None
+    try:
+        with closing(_store.connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT output, created_at FROM generations WHERE key = ?", (key,),
+            ).fetchone()
+            now = time.time()
+            if row is not None:
+                age = now - row[1]
+                if policy == POLICY_TTL and age > (DEFAULT_TTL if ttl is None else ttl):
+                    row = None
+                else:
+                    conn.execute("UPDATE generations SET used_at = ? WHERE key = ?", (now, key))
+    except sqlite3.Error:
+        return None  # a broken cache only means regenerating
+    if row is None:
+        _counters.bump(misses=1)
+        return None
+    _counters.bump(hits=1)
+    return row[0], age
+
+
+def store(key: str, model: str, output: str) -> None:
+    now = time.time()
+    size = len(output.encode())
+    try:
+        with closing(_store.connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO generations VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, output, size, now, now),
+            )
+            _counters.bump(stores=1)
+            _evict(conn)
+    except sqlite3.Error:
+        pass
+
+
+def _evict(conn: sqlite3.Connection) -> None:
+    count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM generations").fetchone()
+    if count <= MAX_ENTRIES and total <= MAX_BYTES:
+        return
+    evicted = 0
+    for key, size in conn.execute("SELECT key, size FROM generations ORDER BY used_at").fetchall():
+        if count <= MAX_ENTRIES and total <= MAX_BYTES:
+            break
+        conn.execute("DELETE FROM generations WHERE key = ?", (key,))
+        count, total, evicted = count - 1, total - size, evicted + 1
+    _counters.bump(evictions=evicted)
+
+
+def generation_cache_stats() -> Dict[str, Any]:
+    stats: Dict[str, Any] = _counters.snapshot()
+    try:
+        with closing(_store.connect()) as conn:
+            stats["entries"], stats["bytes"] = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM generations"
+            ).fetchone()
+    except sqlite3.Error:
+        stats["entries"], stats["bytes"] = 0, 0
+    return stats
+
+
+def clear_generation_cache() -> None:
+    """Drop every stored draft and reset counters."""
+    _store.clear()
+    _counters.reset()
@@ -0,0 +1,179 @@
+"""Shared Anthropic clients — one keep-alive pool per API key and sync/async flavour."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import importlib
+import threading
+import time
+import weakref
+from typing import Any, Dict
+
+import anthropic
+
+# The httpx flavour the SDK is built on (newer SDK releases ship it as httpx2),
+# so pool limits and hooks are given the classes it expects.
+_sdk_httpx = importlib.import_module(
+    anthropic.DefaultHttpxClient.__mro__[1].__module__.partition(".")[0]
+)
+
+_config: Dict[str, Any] = {
+    "max_connections":           10,
+    "max_keepalive_connections": 5,
+    "keepalive_expiry":          60.0,
+    "timeout":                   600.0,  # whole request; long generations stream for minutes
+    "connect_timeout":           5.0,
+    "max_retries":               2,
+}
+
+_sync: Dict[str, anthropic.Anthropic] = {}
+# {event loop: {api key: AsyncAnthropic}} — async pools are bound to their loop.
+_async: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, anthropic.AsyncAnthropic]]" = (
+    weakref.WeakKeyDictionary()
+)
+_stats: Dict[str, Dict[str, float]] = {}
+_lock = threading.Lock()
+
+
+def configure(**settings: Any) -> None:
+    """
+    Override pool settings for clients created from now on.
+    Keys: max_connections, max_keepalive_connections, keepalive_expiry,
+          timeout, connect_timeout, max_retries.
+    """
+    unknown = set(settings) - set(_config)
+    if unknown:
+        raise ValueError(f"Unknown Anthropic pool setting(s): {', '.join(sorted(unknown))}")
+    with _lock:
+        _config.update(settings)
+
+
+def _label(api_key: str, flavour: str) -> str:
+    return f"{flavour}:{hashlib.sha256(api_key.encode()).hexdigest()[:8]}"
+
+
+def _bump(label: str, **deltas: float) -> None:
+    with _lock:
+        s = _stats.setdefault(label, {
+            "requests": 0, "connections_opened": 0, "latency_s": 0.0, "max_latency_s": 0.0,
+        })
+        for k, v in deltas.items():
+            if k == "max_latency_s":
+                s[k] = max(s[k], v)
+            else:
+                s[k] += v
+
+
+def _hooks(label: str, is_async: bool) -> Dict[str, list]:
+    """Event hooks counting requests, new connections and time to response headers."""
+
+    def trace(event: str, info: Dict[str, Any]) -> None:
+        if event == "connection.connect_tcp.complete":
+            _bump(label, connections_opened=1)
+
+    def on_request(request: Any) -> None:
+        request.extensions["trace"] = atrace if is_async else trace
+        # Carried on the request itself, so failed requests leave nothing behind.
+        request.extensions["sent_at"] = time.monotonic()
+
+    def on_response(response: Any) -> None:
+        started = response.request.extensions.get("sent_at")
+        if started is not None:
+            elapsed = time.monotonic() - started
+            _bump(label, requests=1, latency_s=elapsed, max_latency_s=elapsed)
+
+    if not is_async:
+        return {"request": [on_request], "response": [on_response]}
+
+    # The async transport requires coroutine callbacks.
+    async def atrace(event: str, info: Dict[str, Any]) -> None:
+        trace(event, info)
+
+    async def a_on_request(request: Any) -> None:
+        on_request(request)
+
+    async def a_on_response(response: Any) -> None:
+        on_response(response)
+
+    return {"request": [a_on_request], "response": [a_on_response]}
+
+
+def _http_options() -> Dict[str, Any]:
+    cfg = dict(_config)
+    return {
+        "limits": _sdk_httpx.Limits(
+            max_connections=cfg["max_connections"],
+            max_keepalive_connections=cfg["max_keepalive_connections"],
+            keepalive_expiry=cfg["keepalive_expiry"],
+        ),
+        "timeout": _sdk_httpx.Timeout(cfg["timeout"], connect=cfg["connect_timeout"]),
+    }
+
+
+def get_client(api_key: str) -> anthropic.Anthropic:
+    """The process-wide sync client for `api_key`."""
+    with _lock:
+        client = _sync.get(api_key)
+        if client is not None and not client.is_closed():
+            return client
+        max_retries = _config["max_retries"]
+    new = anthropic.Anthropic(
+        api_key=api_key,
+        max_retries=max_retries,
+        http_client=anthropic.DefaultHttpxClient(
+            event_hooks=_hooks(_label(api_key, "sync"), is_async=False),
+            **_http_options(),
+        ),
+    )
+    with _lock:
+        # Another thread may have won the race; keep the first one.
+        client = _sync.get(api_key)
+        if client is None or client.is_closed():
+            client = _sync[api_key] = new
+    if client is not new:
+        new.close()
+    return client
+
+
+def get_async_client(api_key: str) -> anthropic.AsyncAnthropic:
+    """The shared async client for `api_key` on the running loop."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        per_loop = _async.setdefault(loop, {})
+        client = per_loop.get(api_key)
+        if client is not None and not client.is_closed():
+            return client
+        max_retries = _config["max_retries"]
+    client = anthropic.AsyncAnthropic(
+        api_key=api_key,
+        max_retries=max_retries,
+        http_client=anthropic.DefaultAsyncHttpxClient(
+            event_hooks=_hooks(_label(api_key, "async"), is_async=True),
+            **_http_options(),
+        ),
+    )
+    with _lock:
+        per_loop[api_key] = client  # only this loop's thread creates its clients
+    return client
+
+
+def client_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Per-client counters, keyed "<sync|async>:<key fingerprint>":
+    {"requests", "connections_opened", "reused", "reuse_ratio",
+     "avg_latency_s", "max_latency_s"} (latency is time to response headers).
+    """
+    with _lock:
+        snapshot = {label: dict(s) for label, s in _stats.items()}
+    for s in snapshot.values():
+        n = s["requests"]
+        s["reused"] = max(0, n - s["connections_opened"])
+        s["reuse_ratio"] = round(s["reused"] / n, 3) if n else 0.0
+        s["avg_latency_s"] = round(s.pop("latency_s") / n, 3) if n else 0.0
+        s["max_latency_s"] = round(s["max_latency_s"], 3)
+    return snapshot
+
+
+def reset_stats() -> None:
+    with _lock:
+        _stats.clear()
@@ -0,0 +1,35 @@
+"""One long-lived asyncio event loop, on its own thread, that owns all agent I/O."""
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Coroutine, Optional
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_lock = threading.Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Return the shared loop, starting its daemon thread on first use."""
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="agent-loop", daemon=True).start()
+        return _loop
+
+
+def submit(coro: Coroutine[Any, Any, Any]) -> concurrent.futures.Future:
+    """Schedule `coro` on the shared loop from any thread. Non-blocking."""
+    return asyncio.run_coroutine_threadsafe(coro, get_loop())
+
+
+def run(coro: Coroutine[Any, Any, Any], timeout: Optional[float] = None) -> Any:
+    """Run `coro` on the shared loop and block the calling thread for its result."""
+    return submit(coro).result(timeout)
+
+
+def call_soon(callback: Any, *args: Any) -> None:
+    """Run a plain callback on the loop thread."""
+    get_loop().call_soon_threadsafe(callback, *args)
@@ -0,0 +1,114 @@
+"""Process pool for CPU-bound stages (docx extraction and rendering), off the GIL."""
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+# Set COSN_PROCESS_POOL=0 to run these stages on a thread in-process instead.
+PROCESS_POOL = os.getenv("COSN_PROCESS_POOL", "1") != "0"
+# Leave a core for the Streamlit server and the agent loop.
+PROCESS_WORKERS = int(os.getenv("COSN_PROCESS_WORKERS", str(max(1, min(4, (os.cpu_count() or 2) - 1)))))
+
+# After this many pool breakages in a row the process stops trying workers
+# (e.g. the platform cannot spawn them) and stays on threads.
+MAX_POOL_FAILURES = 3
+
+_executor: Optional[ProcessPoolExecutor] = None
+_failures = 0
+_warmed = False
+_stats: Dict[str, int] = {"process_calls": 0, "thread_calls": 0, "fallbacks": 0}
+_lock = threading.Lock()
+
+
+def _warm_imports() -> None:
+    """Worker initializer — pay the heavy imports once per worker, not per call."""
+    import mammoth  # noqa: F401
+    import agent.files  # noqa: F401
+    import agent.output  # noqa: F401
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            # spawn, not fork: the parent runs threads (Streamlit, the agent
+            # loop), and forking a threaded process can deadlock the child.
+            _executor = ProcessPoolExecutor(
+                max_workers=PROCESS_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_imports,
+            )
+        return _executor
+
+
+def _discard_executor(broken: ProcessPoolExecutor) -> None:
+    global _executor, _failures
+    with _lock:
+        if _executor is broken:
+            _executor = None
+            _failures += 1
+        _stats["fallbacks"] += 1
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _use_processes() -> bool:
+    with _lock:
+        return PROCESS_POOL and _failures < MAX_POOL_FAILURES
+
+
+def _bump(key: str) -> None:
+    global _failures
+    with _lock:
+        _stats[key] += 1
+        if key == "process_calls":
+            _failures = 0
+
+
+async def run_cpu(fn: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run a module-level function in the process pool (arguments and result are
+    pickled, so pass and return plain bytes/str). Falls back to a thread when
+    the pool is disabled or a worker died.
+    """
+    if _use_processes():
+        executor = _get_executor()
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            _discard_executor(executor)
+        else:
+            _bump("process_calls")
+            return result
+    _bump("thread_calls")
+    return await asyncio.to_thread(fn, *args)
+
+
+def warm_up() -> None:
+    """Start the workers in the background now rather than on the first run. Idempotent."""
+    global _warmed
+    with _lock:
+        if _warmed or not PROCESS_POOL:
+            return
+        _warmed = True
+    executor = _get_executor()
+    for _ in range(PROCESS_WORKERS):
+        executor.submit(_warm_imports)
+
+
+def shutdown() -> None:
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+def procpool_stats() -> Dict[str, Any]:
+    mode = "process" if _use_processes() else "thread"
+    with _lock:
+        return {**_stats, "mode": mode, "workers": PROCESS_WORKERS}
@@ -0,0 +1,169 @@
+"""Local BM25 retrieval over uploaded context docs — send only the relevant chunks."""
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Iterable, List, Tuple
+
+from agent.budget import estimate_tokens
+
+# Documents smaller than this are sent whole; larger ones are chunked,
+# indexed and cut down to the chunks that best match the run.
+RETRIEVAL_MIN_TOKENS = 4_000
+RETRIEVAL_BUDGET = 8_000   # tokens of retrieved chunks per run, across all docs
+RETRIEVAL_TOP_K = 24
+CHUNK_TOKENS = 300
+MAX_INDEXES = 64           # indexes kept in memory, least recently used evicted
+
+# BM25 parameters (the usual defaults).
+K1 = 1.5
+B = 0.75
+
+CHUNK_SEPARATOR = "\n\n[…]\n\n"
+
+_STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from
+further had has have having he her here hers him his how i if in into is it its itself
+just me more most my no nor not now of off on once only or other our out over own same
+she should so some such than that the their them then there these they this those
+through to too under until up very was we were what when where which while who whom why
+will with would you your
+""".split())
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    return [w for w in _WORD.findall(text.lower()) if w not in _STOPWORDS and len(w) > 1]
+
+
+def chunk_text(text: str, chunk_tokens: int = CHUNK_TOKENS) -> List[str]:
+    """Split on paragraphs, packing them into chunks of about `chunk_tokens`."""
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for para in re.split(r"\n\s*\n|\n", text):
+        para = para.strip()
+        if not para:
+            continue
+        tokens = estimate_tokens(para)
+        if current and size + tokens > chunk_tokens:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        current.append(para)
+        size += tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+class ChunkIndex:
+    """Chunked document with per-chunk term frequencies, built once per text hash."""
+
+    def __init__(self, text: str) -> None:
+        self.chunks = chunk_text(text)
+        self.term_freqs = [Counter(tokenize(c)) for c in self.chunks]
+        self.lengths = [sum(tf.values()) for tf in self.term_freqs]
+        self.doc_freq: Counter = Counter()
+        for tf in self.term_freqs:
+            self.doc_freq.update(tf.keys())
+
+
+_indexes: "OrderedDict[str, ChunkIndex]" = OrderedDict()
+_stats: Dict[str, int] = {"built": 0, "reused": 0}
+_lock = threading.Lock()
+
+
+def get_index(text: str) -> ChunkIndex:
+    key = hashlib.sha256(text.encode()).hexdigest()
+    with _lock:
+        index = _indexes.get(key)
+        if index is not None:
+            _indexes.move_to_end(key)
+            _stats["reused"] += 1
+            return index
+    index = ChunkIndex(text)
+    with _lock:
+        _indexes[key] = index
+        _stats["built"] += 1
+        while len(_indexes) > MAX_INDEXES:
+            _indexes.popitem(last=False)
+    return index
+
+
+def _bm25(indexes: List[ChunkIndex], query: Iterable[str]) -> List[Tuple[float, int, int]]:
+    """(score, doc position, chunk position) for every chunk, with corpus-wide statistics."""
+    n_chunks = sum(len(ix.chunks) for ix in indexes)
+    total_len = sum(sum(ix.lengths) for ix in indexes)
+    avgdl = total_len / n_chunks if n_chunks else 0.0
+    terms = set(query)
+    idf = {}
+    for term in terms:
+        df = sum(ix.doc_freq.get(term, 0) for ix in indexes)
+        if df:
+            idf[term] = math.log(1 + (n_chunks - df + 0.5) / (df + 0.5))
+
+    scored: List[Tuple[float, int, int]] = []
+    for d, ix in enumerate(indexes):
+        for c, tf in enumerate(ix.term_freqs):
+            norm = K1 * (1 - B + B * ix.lengths[c] / avgdl) if avgdl else K1
+            score = sum(
+                idf[t] * tf[t] * (K1 + 1) / (tf[t] + norm)
+                for t in idf if t in tf
+            )
+            scored.append((score, d, c))
+    return scored
+
+
+def select(
+    docs: Dict[str, str], query: str,
+    budget: int = RETRIEVAL_BUDGET, top_k: int = RETRIEVAL_TOP_K,
+) -> Tuple[Dict[str, str], Dict[str, Any]]:
+    """
+    Replace each large document with its chunks most relevant to `query`,
+    best-first until `budget` tokens or `top_k` chunks, kept in document order.
+    Returns (docs, report).
+    """
+    large = [name for name, text in docs.items() if estimate_tokens(text) >= RETRIEVAL_MIN_TOKENS]
+    if not large:
+        return docs, {}
+
+    indexes = [get_index(docs[name]) for name in large]
+    # Ties (notably all-zero scores when nothing matches) go to earlier chunks.
+    ranked = sorted(_bm25(indexes, tokenize(query)), key=lambda s: (-s[0], s[2]))
+
+    picked: Dict[int, List[int]] = {d: [] for d in range(len(large))}
+    used = count = 0
+    matched = ranked[0][0] > 0 if ranked else False
+    for score, d, c in ranked:
+        # With no match at all, the leading chunks stand in.
+        if count >= top_k or (matched and score <= 0):
+            break
+        cost = estimate_tokens(indexes[d].chunks[c])
+        if used + cost > budget:
+            continue
+        picked[d].append(c)
+        used += cost
+        count += 1
+
+    out = dict(docs)
+    report: Dict[str, Any] = {}
+    for d, name in enumerate(large):
+        chosen = sorted(picked[d])
+        out[name] = CHUNK_SEPARATOR.join(indexes[d].chunks[c] for c in chosen)
+        report[name] = {
+            "chunks":        len(indexes[d].chunks),
+            "selected":      len(chosen),
+            "tokens_before": estimate_tokens(docs[name]),
+            "tokens_after":  estimate_tokens(out[name]),
+        }
+    return out, report
+
+
+def retrieval_stats() -> Dict[str, int]:
+    with _lock:
+        return {**_stats, "indexes": len(_indexes)}
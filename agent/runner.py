@@ -1,142 +1,245 @@
-"""Background task execution — runs the full pipeline in a daemon thread."""
+"""Background task execution — every run is a coroutine on the shared agent loop."""
 from __future__ import annotations
 
 import asyncio
-import io
+import bisect
+import hashlib
+import itertools
+import os
 import threading
+import time
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from agent import loop as agent_loop
+from agent import procpool
 
 _results: Dict[str, Dict] = {}
 _lock = threading.Lock()
 
+# ── Run queue ─────────────────────────────────────────────────────────────────
+# Runs wait in one queue; manual "Run now" outranks scheduled runs, and within
+# a priority runs start in submission order. Runs are mostly waiting on I/O, so
+# up to MAX_WORKERS of them are multiplexed on the agent loop (agent.loop)
+# rather than each holding an OS thread; only file extraction and .docx
+# rendering step off the loop (agent.procpool). A task never has more than PER_TASK_CONCURRENCY
+# runs in flight (results are keyed by task id).
+MAX_WORKERS = int(os.getenv("COSN_MAX_WORKERS", "16"))
+PER_TASK_CONCURRENCY = 1
+
+PRIORITY_MANUAL = 0
+PRIORITY_SCHEDULED = 1
+
+_pending: List[Dict[str, Any]] = []
+_running: Dict[str, int] = {}          # task_id → runs in flight
+_seq = itertools.count()
+_active: Set[asyncio.Task] = set()     # loop thread only
+_pool_stats: Dict[str, float] = {"busy": 0, "started": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0}
+
+# Input fingerprints of each task's last successful run, for tasks in
+# "only run when inputs change" mode (task["skip_unchanged"]).
+_last_inputs: Dict[str, Dict[str, str]] = {}
+
+# Live runs stream their draft; text is published to pollers at most every
+# PARTIAL_INTERVAL seconds. Each task's partial is kept as its published
+# chunks plus cumulative end offsets, so a delta poll joins only new chunks.
+STREAM_RUNS = os.getenv("COSN_STREAM_RUNS", "1") != "0"
+PARTIAL_INTERVAL = 0.25  # seconds
+
+_partials: Dict[str, Tuple[List[str], List[int]]] = {}  # task_id → (chunks, ends)
+# Finished runs whose output does not extend what was streamed (e.g. a
+# section-mode consistency pass rewrote the draft); pollers replace their text.
+_stream_resets: Set[str] = set()
+
 
 # ── Result accessors ──────────────────────────────────────────────────────────
 
+def _queue_info(task_id: str) -> Dict[str, Any]:
+    """Caller holds _lock."""
+    ordered = sorted(_pending, key=lambda j: (j["priority"], j["seq"]))
+    position = next((i for i, j in enumerate(ordered, 1) if j["task_id"] == task_id), None)
+    job = ordered[position - 1] if position else None
+    started = _pool_stats["started"]
+    return {
+        "length":           len(_pending),
+        "position":         position,  # None once the run has started
+        "waiting_s":        round(time.monotonic() - job["enqueued_at"], 1) if job else 0.0,
+        "active_workers":   int(_pool_stats["busy"]),
+        "max_workers":      MAX_WORKERS,
+        "avg_wait_s":       round(_pool_stats["wait_seconds"] / started, 2) if started else 0.0,
+        "max_wait_s":       round(_pool_stats["max_wait_seconds"], 2),
+    }
+
+
 def poll_result(task_id: str) -> Optional[Dict]:
     with _lock:
         r = _results.get(task_id)
-        return dict(r) if r else None
+        if not r:
+            return None
+        out = dict(r)
+        out["queue"] = _queue_info(task_id)
+        return out
+
+
+def poll_partial(task_id: str, offset: int = 0) -> Optional[Dict[str, Any]]:
+    """
+    Text generated since `offset` for a task's current run.
+    Returns {"status", "delta", "offset"}; pass the returned offset to the
+    next call. Once the run is done the delta is drawn from the final output —
+    or, with "reset": True, the delta is the whole output and replaces the
+    text received so far.
+    """
+    with _lock:
+        r = _results.get(task_id)
+        if not r:
+            return None
+        status = r["status"]
+        if status == "done":
+            text = r["output"]
+            if offset and task_id in _stream_resets:
+                return {"status": status, "delta": text, "offset": len(text), "reset": True}
+            return {"status": status, "delta": text[offset:], "offset": len(text)}
+        chunks, ends = _partials.get(task_id, ([], []))
+        if not ends or ends[-1] <= offset:
+            return {"status": status, "delta": "", "offset": offset}
+        i = bisect.bisect_right(ends, offset)
+        start = ends[i - 1] if i else 0
+        delta = "".join(chunks[i:])[offset - start:]
+        return {"status": status, "delta": delta, "offset": ends[-1]}
 
 
 def clear_result(task_id: str) -> None:
     with _lock:
         _results.pop(task_id, None)
+        _partials.pop(task_id, None)
+        _stream_resets.discard(task_id)
+
+
+def forget_inputs(task_id: str) -> None:
+    """Drop the stored fingerprints so the task's next run always generates."""
+    with _lock:
+        _last_inputs.pop(task_id, None)
 
 
 # ── Pipeline ──────────────────────────────────────────────────────────────────
 
-def _extract_bytes(name: str, data: bytes) -> str:
-    import mammoth
-    if name.lower().endswith(".docx"):
-        return mammoth.extract_raw_text(io.BytesIO(data)).value.strip()
-    return data.decode("utf-8", errors="replace").strip()
+async def _extract(name: str, data: bytes) -> str:
+    """Cached text of an uploaded file; cache misses are parsed in the process pool."""
+    from agent.files import cached_text, parse_bytes, store_text
 
+    key, text = cached_text(name, data)
+    if text is None:
+        text = await procpool.run_cpu(parse_bytes, name, data)
+        store_text(key, text)
+    return text
+
+
+def _digest(data: Any) -> str:
+    if isinstance(data, str):
+        data = data.encode()
+    return hashlib.sha256(data).hexdigest()[:16]
 
-def _run_pipeline(task: Dict[str, Any], api_config: Dict[str, str]) -> Dict[str, Any]:
-    """Full fetch → normalize → generate → docx pipeline. Runs synchronously."""
-    from agent.sources.luma import fetch_luma_events, normalize_luma
-    from agent.sources.spotify import fetch_spotify_episodes, normalize_spotify
-    from agent.sources.webflow import (
-        fetch_webflow_jobs, normalize_webflow_jobs,
-        fetch_webflow_blogs, normalize_webflow_blogs,
-    )
-    from agent.context import assemble_context
-    from agent.claude import generate_text
-    from agent.output import generate_docx
+
+def _input_fingerprints(task: Dict[str, Any], texts: Dict[str, str]) -> Dict[str, str]:
+    """One short hash per input that shapes the draft. Files hash their raw bytes."""
+    fps = {f"source:{name}": _digest(text) for name, text in texts.items()}
+    if task.get("template"):
+        fps["template"] = _digest(task["template"]["bytes"])
+    for doc in task.get("context_docs") or []:
+        fps[f"doc:{doc['name']}"] = _digest(doc["bytes"])
+    fps["instructions"] = _digest(task.get("instructions") or "")
+    fps["model"] = task["model"]
+    fps["input_token_budget"] = str(task.get("input_token_budget"))
+    fps["retrieval"] = f"on:{task.get('retrieval_tokens')}" if task.get("doc_retrieval", True) else "off"
+    if task.get("section_mode"):
+        fps["sections"] = "consistency" if task.get("section_consistency") else "parallel"
+    if task.get("doc_summaries"):
+        fps["summaries"] = _digest(f"{task.get('summary_model')}:{task.get('summary_tokens')}")
+    return fps
+
+
+async def _run_pipeline(
+    task: Dict[str, Any], api_config: Dict[str, str], manual: bool = False,
+) -> Dict[str, Any]:
+    """
+    Full fetch → normalize → generate → docx pipeline, on the agent loop.
+    manual: a user-initiated run — it always generates and is never batched.
+    """
+    from agent.context import TASK_INSTRUCTION, assemble_blocks, blocks_text
+    from agent.claude import DEFAULT_MAX_TOKENS, SYSTEM_PROMPT, agenerate, request_params
+    from agent import batches, budget, generation_cache, retrieval, summaries, template_sections
+    from agent.sources import snapshots
+    from agent.sources.registry import all_sources
+    from agent.sources.resilience import FETCH_DEADLINE, gather_with_deadline
 
     src = task["sources"]
 
-    # 1. Fetch all sources in parallel
-    async def _fetch():
-        coros: Dict[str, Any] = {}
-        if src["luma"]["enabled"] and api_config.get("luma_key"):
-            coros["luma"] = fetch_luma_events(api_config["luma_key"], src["luma"]["days"])
-        if src["spotify"]["enabled"] and api_config.get("spotify_id") and api_config.get("spotify_secret"):
-            coros["spotify"] = fetch_spotify_episodes(
-                api_config["spotify_id"], api_config["spotify_secret"], src["spotify"]["days"]
-            )
-        if src["webflow"]["enabled"] and api_config.get("webflow_key"):
-            coros["webflow"] = fetch_webflow_jobs(
-                api_config["webflow_key"],
-                api_config.get("webflow_jobs_collection", ""),
-                api_config.get("webflow_domain", ""),
-                src["webflow"].get("days", 7),
-                src["webflow"].get("featured_first", True),
-            )
-        if src.get("webflow_blogs", {}).get("enabled") and api_config.get("webflow_key") and api_config.get("webflow_blogs_collection"):
-            coros["webflow_blogs"] = fetch_webflow_blogs(
-                api_config["webflow_key"],
-                api_config["webflow_blogs_collection"],
-                api_config.get("webflow_domain", ""),
-                src["webflow_blogs"].get("days", 7),
-                src["webflow_blogs"].get("featured_first", True),
-            )
-        if not coros:
-            return {}
-        gathered = await asyncio.gather(*coros.values(), return_exceptions=True)
-        return dict(zip(coros.keys(), gathered))
-
-    loop = asyncio.new_event_loop()
-    try:
-        raw = loop.run_until_complete(_fetch())
-    finally:
-        loop.close()
+    # 1–2. Fetch + normalize every enabled source concurrently. Each source is
+    #      normalized as soon as its own fetch lands; identical fetches from
+    #      concurrent runs are coalesced and recent snapshots are served
+    #      stale-while-revalidate. The whole stage is bounded by one deadline.
+    registered = all_sources()
+    active = [
+        s for s in registered
+        if src.get(s.name, {}).get("enabled") and s.is_configured(api_config)
+    ]
+    # Start the most expensive fetches first so they overlap the cheap ones.
+    active.sort(key=lambda s: -s.cost(src[s.name]))
 
-    # 2. Normalize
-    luma_text = spotify_text = webflow_text = blogs_text = ""
-    sources_used: list = []
+    def _snapshot_load(source):
+        cfg = src[source.name]
+        return snapshots.load(
+            source.name, source.cache_key(cfg, api_config),
+            lambda: source.load(cfg, api_config),
+            0 if manual else cfg.get("snapshot_window"),  # "Run now" wants live data
+        )
 
-    if "luma" in raw:
-        r = raw["luma"]
-        if isinstance(r, Exception):
-            sources_used.append(f"Luma (error: {r})")
-        else:
-            luma_text = normalize_luma(r, src["luma"]["days"])
-            sources_used.append(f"Luma ({len(r)} events)")
+    raw = await gather_with_deadline(
+        ((s.name, _snapshot_load(s)) for s in active),
+        task.get("fetch_deadline", FETCH_DEADLINE),
+    )
 
-    if "spotify" in raw:
-        r = raw["spotify"]
+    texts: Dict[str, str] = {}
+    sources_used: list = []
+    for source in registered:
+        if source.name not in raw:
+            continue
+        r = raw[source.name]
         if isinstance(r, Exception):
-            sources_used.append(f"Spotify (error: {r})")
-        else:
-            spotify_text = normalize_spotify(r, src["spotify"]["days"])
-            sources_used.append(f"Spotify ({len(r)} episodes)")
+            sources_used.append(f"{source.label} (error: {r})")
+            continue
+        (texts[source.name], summary), age = r
+        if age is not None:
+            summary += f" · cached {int(age)}s old"
+        sources_used.append(f"{source.label} ({summary})")
 
-    if "webflow" in raw:
-        r = raw["webflow"]
-        if isinstance(r, Exception):
-            sources_used.append(f"Webflow Jobs (error: {r})")
-        else:
-            jobs, domain = r
-            webflow_text = normalize_webflow_jobs(
-                jobs, domain,
-                src["webflow"].get("days", 7),
-                src["webflow"].get("featured_first", True),
-            )
-            sources_used.append(f"Webflow Jobs ({len(jobs)} jobs)")
-
-    if "webflow_blogs" in raw:
-        r = raw["webflow_blogs"]
-        if isinstance(r, Exception):
-            sources_used.append(f"Webflow Blogs (error: {r})")
-        else:
-            posts, domain = r
-            blogs_text = normalize_webflow_blogs(
-                posts, domain,
-                src["webflow_blogs"].get("days", 7),
-                src["webflow_blogs"].get("featured_first", True),
-            )
-            sources_used.append(f"Webflow Blogs ({len(posts)} posts)")
-
-    # 3. Extract uploaded files
-    template_text = ""
-    if task.get("template"):
-        template_text = _extract_bytes(task["template"]["name"], task["template"]["bytes"])
+    # Nothing changed since the last successful run — stop before any
+    # extraction or generation work.
+    fingerprints = _input_fingerprints(task, texts)
+    if task.get("skip_unchanged") and not manual:
+        with _lock:
+            unchanged = _last_inputs.get(task["id"]) == fingerprints
+        if unchanged:
+            return {
+                "status":       "unchanged",
+                "sources_used": sources_used,
+                "timestamp":    datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC"),
+            }
 
-    uploaded_docs: Dict[str, str] = {}
-    for doc in task.get("context_docs", []):
-        uploaded_docs[doc["name"]] = _extract_bytes(doc["name"], doc["bytes"])
+    # 3. Extract uploaded files (CPU-bound — in the process pool, concurrently)
+    template = task.get("template")
+    docs = list(task.get("context_docs") or [])
+    extracted = list(await asyncio.gather(
+        *(_extract(f["name"], f["bytes"]) for f in ([template] if template else []) + docs),
+    ))
+    template_text = extracted.pop(0) if template else ""
+    uploaded_docs: Dict[str, str] = {doc["name"]: text for doc, text in zip(docs, extracted)}
+
+    # Section-parallel mode drafts each top-level template section as its own
+    # request. Batched runs are not latency-bound and stay one request.
+    outline: List[template_sections.TemplateSection] = []
+    if task.get("section_mode") and not batches.is_batchable(task, manual):
+        outline = template_sections.parse_template(template_text)
 
     # Append custom instructions
     if task.get("instructions"):
@@ -145,52 +248,298 @@ def _run_pipeline(task: Dict[str, Any], api_config: Dict[str, str]) -> Dict[str,
             if template_text else task["instructions"]
         )
 
-    # 4. Assemble context
-    context = assemble_context(
-        luma_text=luma_text,
-        spotify_text=spotify_text,
-        webflow_text=webflow_text,
-        blogs_text=blogs_text,
-        uploaded_docs=uploaded_docs or None,
+    # In "summarize once" mode long documents are replaced by their stored
+    # summary (generated the first time a file's content is seen).
+    summary_report: Dict[str, Any] = {}
+    if uploaded_docs and task.get("doc_summaries"):
+        uploaded_docs, summary_report = await summaries.summarize_docs(
+            api_config["anthropic_key"], uploaded_docs,
+            task.get("summary_model"), task.get("summary_tokens"),
+        )
+
+    # Large documents contribute only their chunks relevant to the task. The
+    # query is the template and instructions alone — not the live data — so
+    # the selection, and with it the cached docs block, is stable across runs.
+    retrieval_report: Dict[str, Any] = {}
+    if uploaded_docs and task.get("doc_retrieval", True):
+        uploaded_docs, retrieval_report = await asyncio.to_thread(
+            retrieval.select, uploaded_docs, template_text,
+            task.get("retrieval_tokens") or retrieval.RETRIEVAL_BUDGET,
+        )
+
+    # 4. Fit the sections into the task's input-token budget, then assemble —
+    #    stable docs/template blocks first for prompt caching.
+    sections = [
+        budget.Section("system", SYSTEM_PROMPT + TASK_INSTRUCTION, budget.PRIORITY_TEMPLATE, budget.POLICY_KEEP),
+        budget.Section("template", template_text, budget.PRIORITY_TEMPLATE, budget.POLICY_KEEP),
+        *(budget.Section(f"source:{name}", text, budget.PRIORITY_DATA) for name, text in texts.items()),
+        *(budget.Section(f"doc:{name}", text, budget.PRIORITY_DOCS) for name, text in uploaded_docs.items()),
+    ]
+    token_budget = budget.plan(sections, task.get("input_token_budget") or budget.DEFAULT_INPUT_BUDGET)
+    trimmed = {s.name: s.text for s in sections}
+
+    slotted = {
+        s.context_arg: trimmed[f"source:{s.name}"]
+        for s in registered if s.context_arg and s.name in texts
+    }
+    blocks = assemble_blocks(
+        **slotted,
+        uploaded_docs={name: trimmed[f"doc:{name}"] for name in uploaded_docs} or None,
         template_text=template_text,
+        extra_sections=[
+            trimmed[f"source:{s.name}"] for s in registered if not s.context_arg and s.name in texts
+        ],
+        summarized_docs={name for name, r in summary_report.items() if "error" not in r},
+        task_instruction=template_sections.SECTIONED_TASK_INSTRUCTION if outline else TASK_INSTRUCTION,
     )
+    context = blocks_text(blocks)
+    if budget.COUNT_WITH_API:
+        token_budget["counted_total"] = await budget.count_tokens(
+            api_config["anthropic_key"], request_params(blocks, task["model"], DEFAULT_MAX_TOKENS),
+        )
+    report = {"token_budget": token_budget, "retrieval": retrieval_report, "doc_summaries": summary_report}
 
-    # 5. Generate (non-streaming — runs in background thread)
-    full_text = generate_text(
-        api_key=api_config["anthropic_key"],
-        context=context,
-        model=task["model"],
+    # 5. Generate (streamed to pollers; one request per section in section
+    #    mode), unless the task's cache policy lets an identical earlier
+    #    request's draft stand in.
+    variant = ""
+    if outline:
+        variant = "sections+consistency" if task.get("section_consistency") else "sections"
+    gen_key = generation_cache.generation_key(
+        task["model"], SYSTEM_PROMPT, context, DEFAULT_MAX_TOKENS, variant,
     )
+    hit = await asyncio.to_thread(
+        generation_cache.lookup, gen_key,
+        task.get("generation_cache", generation_cache.POLICY_IDENTICAL),
+        task.get("generation_cache_ttl"),
+    )
+    if hit is not None:
+        full_text, age = hit
+        sources_used.append(f"Claude (cached draft · {int(age // 60)}m old)")
+        return await _finish(task, full_text, None, sources_used, fingerprints, report)
+
+    if batches.is_batchable(task, manual):
+        # Non-urgent: hand the request to the next Message Batch and free this
+        # run's slot; the draft is finished whenever the batch ends.
+        waiter = batches.enqueue(
+            api_config["anthropic_key"], request_params(blocks, task["model"], DEFAULT_MAX_TOKENS),
+        )
+        sources_used.append("Claude (message batch)")
+        _spawn(_finish_batched(task, waiter, gen_key, sources_used, fingerprints, report))
+        return {"status": "running", "batch": {"enqueued_at": time.time()}}
 
-    # 6. Build .docx
-    docx_bytes = generate_docx(full_text, task["model"])
+    started = time.monotonic()
+    publish, flush_partial = _partial_publisher(task["id"]) if STREAM_RUNS else (None, None)
+    if outline:
+        full_text, usage, report["sections"] = await template_sections.agenerate_sections(
+            api_config["anthropic_key"], blocks, outline, task["model"],
+            on_text=publish, consistency=bool(task.get("section_consistency")),
+        )
+    else:
+        full_text, usage = await agenerate(
+            api_key=api_config["anthropic_key"],
+            context=blocks,
+            model=task["model"],
+            max_tokens=DEFAULT_MAX_TOKENS,
+            on_text=publish,
+        )
+    if flush_partial:
+        flush_partial()
+    usage["generation_s"] = round(time.monotonic() - started, 2)
+    await asyncio.to_thread(generation_cache.store, gen_key, task["model"], full_text)
+    return await _finish(task, full_text, usage, sources_used, fingerprints, report)
+
+
+async def _finish(
+    task: Dict[str, Any], full_text: str, usage: Optional[Dict[str, Any]],
+    sources_used: List[str], fingerprints: Dict[str, str], report: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Step 6: build the .docx and the run's result. `report` is merged into it."""
+    from agent import batches, generation_cache
+    from agent.output import generate_docx
+    from agent.sources.cache import cache_stats
+    from agent.sources.coalesce import coalesce_stats
+    from agent.files import extraction_cache_stats
+    from agent.summaries import summary_cache_stats
+    from agent.llm_clients import client_stats
+    from agent.sources.http import pool_stats
+    from agent.sources.ratelimit import limiter_stats
+    from agent.sources.resilience import resilience_stats
+
+    docx_bytes = await procpool.run_cpu(generate_docx, full_text, task["model"])
 
     return {
         "status":      "done",
         "output":      full_text,
         "docx_bytes":  docx_bytes,
         "sources_used": sources_used,
+        "http_pool":   pool_stats(),
+        "http_cache":  cache_stats(),
+        "coalescing":  coalesce_stats(),
+        "rate_limits": limiter_stats(),
+        "resilience":  resilience_stats(),
+        "generation_cache": generation_cache.generation_cache_stats(),
+        "batches":     batches.batch_stats(),
+        "anthropic_pool": client_stats(),
+        "extraction_cache": extraction_cache_stats(),
+        "summary_cache": summary_cache_stats(),
+        "process_pool": procpool.procpool_stats(),
+        "from_cache":  usage is None,
+        "usage":       usage,  # tokens incl. prompt-cache reads/writes; None when reused
+        "fingerprints": fingerprints,
         "timestamp":   datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC"),
+        **report,
     }
 
 
-def _worker(task_id: str, task: Dict[str, Any], api_config: Dict[str, str]) -> None:
+async def _finish_batched(
+    task: Dict[str, Any], waiter: asyncio.Future, gen_key: str,
+    sources_used: List[str], fingerprints: Dict[str, str], report: Dict[str, Any],
+) -> None:
+    from agent import generation_cache
+
+    started = time.monotonic()
     try:
-        result = _run_pipeline(task, api_config)
+        full_text, usage = await waiter
+        usage["generation_s"] = round(time.monotonic() - started, 2)
+        await asyncio.to_thread(generation_cache.store, gen_key, task["model"], full_text)
+        result = await _finish(task, full_text, usage, sources_used, fingerprints, report)
+    except Exception as exc:
+        result = _error_result(exc)
+    _record(task["id"], result)
+
+
+def _partial_publisher(task_id: str) -> Tuple[Callable[[str], None], Callable[[], None]]:
+    """
+    (on_text, flush): on_text batches streamed chunks into bounded-rate
+    publishes; flush publishes whatever is still buffered once generation ends.
+    """
+    with _lock:
+        _partials[task_id] = ([], [])
+        _stream_resets.discard(task_id)
+    buffer: List[str] = []
+    last = time.monotonic()
+
+    def flush() -> None:
+        if not buffer:
+            return
+        chunk = "".join(buffer)
+        buffer.clear()
         with _lock:
-            _results[task_id] = result
+            chunks, ends = _partials.setdefault(task_id, ([], []))
+            chunks.append(chunk)
+            ends.append((ends[-1] if ends else 0) + len(chunk))
+
+    def on_text(text: str) -> None:
+        nonlocal last
+        buffer.append(text)
+        now = time.monotonic()
+        if now - last < PARTIAL_INTERVAL:
+            return
+        last = now
+        flush()
+
+    return on_text, flush
+
+
+def _spawn(coro: Any) -> None:
+    t = asyncio.get_running_loop().create_task(coro)
+    _active.add(t)
+    t.add_done_callback(_active.discard)
+
+
+def _error_result(exc: Exception) -> Dict[str, Any]:
+    return {
+        "status":    "error",
+        "error":     str(exc),
+        "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC"),
+    }
+
+
+def _record(task_id: str, result: Dict[str, Any]) -> None:
+    with _lock:
+        if result["status"] == "done":
+            _last_inputs[task_id] = result["fingerprints"]
+        if result["status"] != "running":
+            chunks, _ = _partials.pop(task_id, ([], []))  # the final output supersedes it
+            if result["status"] == "done" and not result["output"].startswith("".join(chunks)):
+                _stream_resets.add(task_id)
+        _results[task_id] = result
+
+
+async def _execute(
+    task_id: str, task: Dict[str, Any], api_config: Dict[str, str], manual: bool = False,
+) -> None:
+    try:
+        result = await _run_pipeline(task, api_config, manual)
     except Exception as exc:
+        result = _error_result(exc)
+    _record(task_id, result)
+
+
+def _claim_next() -> Optional[Dict[str, Any]]:
+    """Take the best runnable job, or None. Caller holds _lock."""
+    if _pool_stats["busy"] >= MAX_WORKERS:
+        return None
+    runnable = [j for j in _pending if _running.get(j["task_id"], 0) < PER_TASK_CONCURRENCY]
+    if not runnable:
+        return None
+    job = min(runnable, key=lambda j: (j["priority"], j["seq"]))
+    _pending.remove(job)
+    task_id = job["task_id"]
+    _running[task_id] = _running.get(task_id, 0) + 1
+    waited = time.monotonic() - job["enqueued_at"]
+    _pool_stats["busy"] += 1
+    _pool_stats["started"] += 1
+    _pool_stats["wait_seconds"] += waited
+    _pool_stats["max_wait_seconds"] = max(_pool_stats["max_wait_seconds"], waited)
+    return job
+
+
+async def _run_job(job: Dict[str, Any]) -> None:
+    task_id = job["task_id"]
+    try:
+        await _execute(task_id, job["task"], job["api_config"], manual=job["priority"] == PRIORITY_MANUAL)
+    finally:
         with _lock:
-            _results[task_id] = {
-                "status":    "error",
-                "error":     str(exc),
-                "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC"),
-            }
+            _running[task_id] -= 1
+            if not _running[task_id]:
+                del _running[task_id]
+            _pool_stats["busy"] -= 1
+        _dispatch()
+
+
+def _dispatch() -> None:
+    """Start queued runs while there is capacity. Runs on the loop thread."""
+    while True:
+        with _lock:
+            job = _claim_next()
+        if job is None:
+            return
+        _spawn(_run_job(job))
 
 
-def submit_task(task: Dict[str, Any], api_config: Dict[str, str]) -> None:
-    """Submit a task for background execution. Non-blocking."""
+def submit_task(
+    task: Dict[str, Any], api_config: Dict[str, str], manual: bool = False,
+) -> None:
+    """
+    Queue a task for background execution. Non-blocking; safe from any thread.
+    manual: a user-initiated run, which jumps ahead of scheduled ones.
+    """
+    priority = PRIORITY_MANUAL if manual else PRIORITY_SCHEDULED
     with _lock:
+        queued = next((j for j in _pending if j["task_id"] == task["id"]), None)
+        if queued is not None:
+            # Already waiting — refresh its inputs and keep the better priority.
+            queued.update(task=task, api_config=api_config, priority=min(priority, queued["priority"]))
+            return
         _results[task["id"]] = {"status": "running"}
-    t = threading.Thread(target=_worker, args=(task["id"], task, api_config), daemon=True)
-    t.start()
+        _pending.append({
+            "task_id":     task["id"],
+            "task":        task,
+            "api_config":  api_config,
+            "priority":    priority,
+            "seq":         next(_seq),
+            "enqueued_at": time.monotonic(),
+        })
+    agent_loop.call_soon(_dispatch)
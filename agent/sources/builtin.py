@@ -0,0 +1,138 @@
+"""Built-in source plugins: Luma, Spotify, Webflow Jobs and Webflow Blogs."""
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, List, Tuple
+
+from agent.sources.luma import MAX_EVENTS, PAGE_LIMIT, normalize_luma_stream, stream_luma_events
+from agent.sources.registry import Source, register
+from agent.sources.spotify import fetch_spotify_episodes, normalize_spotify
+from agent.sources.webflow import (
+    fetch_webflow_blogs, fetch_webflow_jobs,
+    normalize_webflow_blogs, normalize_webflow_jobs,
+)
+
+
+class LumaSource(Source):
+    name = "luma"
+    label = "Luma"
+    icon = "📅"
+    context_arg = "luma_text"
+    defaults = {"days": 21}
+
+    def credentials(self, api_config: Dict[str, str]) -> List[str]:
+        return [api_config.get("luma_key", "")]
+
+    def cost(self, cfg: Dict[str, Any]) -> float:
+        return math.ceil(cfg.get("max_events", MAX_EVENTS) / PAGE_LIMIT)
+
+    async def fetch(self, cfg: Dict[str, Any], api_config: Dict[str, str]) -> Tuple[str, int]:
+        # Normalized while it streams, so the raw event list is never held.
+        return await normalize_luma_stream(
+            stream_luma_events(
+                api_config["luma_key"], cfg["days"], cfg.get("max_events", MAX_EVENTS),
+            ),
+            cfg["days"],
+        )
+
+    def normalize(self, raw: Tuple[str, int], cfg: Dict[str, Any]) -> Tuple[str, str]:
+        text, n_events = raw
+        return text, f"{n_events} events"
+
+
+class SpotifySource(Source):
+    name = "spotify"
+    label = "Spotify"
+    icon = "🎙️"
+    context_arg = "spotify_text"
+    defaults = {"days": 7}
+
+    def credentials(self, api_config: Dict[str, str]) -> List[str]:
+        return [api_config.get("spotify_id", ""), api_config.get("spotify_secret", "")]
+
+    async def fetch(self, cfg: Dict[str, Any], api_config: Dict[str, str]) -> list[dict]:
+        return await fetch_spotify_episodes(
+            api_config["spotify_id"], api_config["spotify_secret"], cfg["days"],
+        )
+
+    def normalize(self, raw: list[dict], cfg: Dict[str, Any]) -> Tuple[str, str]:
+        return normalize_spotify(raw, cfg["days"]), f"{len(raw)} episodes"
+
+
+class WebflowJobsSource(Source):
+    name = "webflow"
+    label = "Webflow Jobs"
+    icon = "💼"
+    context_arg = "webflow_text"
+    defaults = {"days": 7, "featured_first": True, "incremental": False}
+
+    def credentials(self, api_config: Dict[str, str]) -> List[str]:
+        return [
+            api_config.get("webflow_key", ""),
+            api_config.get("webflow_jobs_collection", ""),
+            api_config.get("webflow_domain", ""),
+        ]
+
+    def is_configured(self, api_config: Dict[str, str]) -> bool:
+        # The collection is auto-discovered when not configured.
+        return bool(api_config.get("webflow_key"))
+
+    def cost(self, cfg: Dict[str, Any]) -> float:
+        return 1.0 if cfg.get("incremental") else 3.0
+
+    async def fetch(self, cfg: Dict[str, Any], api_config: Dict[str, str]) -> Tuple[list[dict], str]:
+        return await fetch_webflow_jobs(
+            api_config["webflow_key"],
+            api_config.get("webflow_jobs_collection", ""),
+            api_config.get("webflow_domain", ""),
+            cfg.get("days", 7),
+            cfg.get("featured_first", True),
+            incremental=cfg.get("incremental", False),
+        )
+
+    def normalize(self, raw: Tuple[list[dict], str], cfg: Dict[str, Any]) -> Tuple[str, str]:
+        jobs, domain = raw
+        text = normalize_webflow_jobs(jobs, domain, cfg.get("days", 7), cfg.get("featured_first", True))
+        return text, f"{len(jobs)} jobs"
+
+
+class WebflowBlogsSource(Source):
+    name = "webflow_blogs"
+    label = "Webflow Blogs"
+    icon = "📰"
+    context_arg = "blogs_text"
+    defaults = {"days": 7, "featured_first": True, "incremental": False}
+
+    def credentials(self, api_config: Dict[str, str]) -> List[str]:
+        return [
+            api_config.get("webflow_key", ""),
+            api_config.get("webflow_blogs_collection", ""),
+            api_config.get("webflow_domain", ""),
+        ]
+
+    def is_configured(self, api_config: Dict[str, str]) -> bool:
+        return bool(api_config.get("webflow_key") and api_config.get("webflow_blogs_collection"))
+
+    def cost(self, cfg: Dict[str, Any]) -> float:
+        return 1.0 if cfg.get("incremental") else 3.0
+
+    async def fetch(self, cfg: Dict[str, Any], api_config: Dict[str, str]) -> Tuple[list[dict], str]:
+        return await fetch_webflow_blogs(
+            api_config["webflow_key"],
+            api_config["webflow_blogs_collection"],
+            api_config.get("webflow_domain", ""),
+            cfg.get("days", 7),
+            cfg.get("featured_first", True),
+            incremental=cfg.get("incremental", False),
+        )
+
+    def normalize(self, raw: Tuple[list[dict], str], cfg: Dict[str, Any]) -> Tuple[str, str]:
+        posts, domain = raw
+        text = normalize_webflow_blogs(posts, domain, cfg.get("days", 7), cfg.get("featured_first", True))
+        return text, f"{len(posts)} posts"
+
+
+register(LumaSource())
+register(SpotifySource())
+register(WebflowJobsSource())
+register(WebflowBlogsSource())
@@ -0,0 +1,203 @@
+"""On-disk HTTP response cache with ETag / Last-Modified revalidation."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import httpx
+
+CACHE_ENABLED = os.getenv("COSN_HTTP_CACHE", "1") != "0"
+CACHE_DIR = Path(os.getenv("COSN_CACHE_DIR", ".cache")) / "http"
+
+# Seconds a stored response is served without contacting the upstream at all.
+# Past the TTL the entry is revalidated with a conditional request.
+SOURCE_TTLS: Dict[str, int] = {
+    "luma":    60,
+    "spotify": 300,
+    "webflow": 60,
+}
+
+# Entries untouched for MAX_AGE are deleted, then least-recently-written ones
+# until the cache is under MAX_BYTES. Request URLs change over time (Luma's
+# window moves every hour, Webflow pages by offset), so without pruning the
+# directory only grows. Pruning runs from _store at most every PRUNE_INTERVAL.
+MAX_BYTES = int(os.getenv("COSN_HTTP_CACHE_MB", "100")) * 1024 * 1024
+MAX_AGE = float(os.getenv("COSN_HTTP_CACHE_DAYS", "7")) * 86400
+PRUNE_INTERVAL = 300  # seconds
+
+_KEPT_HEADERS = ("content-type", "etag", "last-modified")
+
+_stats: Dict[str, Dict[str, float]] = {}
+_pruned = {"at": 0.0}
+_lock = threading.Lock()
+
+
+def fingerprint(secret: str) -> str:
+    """Short stable hash so credentials can partition the cache without being stored."""
+    return hashlib.sha256(secret.encode()).hexdigest()[:16]
+
+
+def _key(url: str, params: Optional[Dict[str, Any]], vary: str) -> str:
+    raw = json.dumps([url, sorted((params or {}).items()), vary], default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _paths(key: str) -> tuple[Path, Path]:
+    base = CACHE_DIR / key[:2]
+    return base / f"{key}.json", base / f"{key}.body"
+
+
+def _load(key: str) -> Optional[tuple[Dict[str, Any], bytes]]:
+    meta_path, body_path = _paths(key)
+    try:
+        meta = json.loads(meta_path.read_text())
+        return meta, body_path.read_bytes()
+    except (OSError, ValueError):
+        return None
+
+
+def _store(key: str, meta: Dict[str, Any], body: Optional[bytes]) -> None:
+    meta_path, body_path = _paths(key)
+    try:
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        if body is not None:
+            tmp = body_path.with_suffix(".tmp")
+            tmp.write_bytes(body)
+            os.replace(tmp, body_path)
+        tmp = meta_path.with_suffix(".tmpmeta")
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, meta_path)
+    except OSError:
+        pass  # a read-only or full disk just means no caching
+    _maybe_prune()
+
+
+def _maybe_prune() -> None:
+    now = time.time()
+    with _lock:
+        if now - _pruned["at"] < PRUNE_INTERVAL:
+            return
+        _pruned["at"] = now
+    prune()
+
+
+def prune() -> int:
+    """Apply the age and size caps; returns the number of entries deleted."""
+    entries = []  # (written at, bytes, meta path, body path)
+    for meta_path in CACHE_DIR.glob("*/*.json"):
+        body_path = meta_path.with_suffix(".body")
+        try:
+            stat = meta_path.stat()
+            size = stat.st_size + (body_path.stat().st_size if body_path.exists() else 0)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, size, meta_path, body_path))
+    entries.sort()  # oldest write first
+
+    now = time.time()
+    total = sum(e[1] for e in entries)
+    deleted = 0
+    for written, size, meta_path, body_path in entries:
+        if now - written <= MAX_AGE and total <= MAX_BYTES:
+            break
+        meta_path.unlink(missing_ok=True)
+        body_path.unlink(missing_ok=True)
+        total -= size
+        deleted += 1
+    return deleted
+
+
+def _bump(source: str, **deltas: float) -> None:
+    with _lock:
+        s = _stats.setdefault(source, {
+            "hits": 0, "revalidated": 0, "misses": 0,
+            "bytes_saved": 0, "bytes_fetched": 0, "fetch_seconds": 0.0,
+        })
+        for k, v in deltas.items():
+            s[k] += v
+
+
+def _from_cache(meta: Dict[str, Any], body: bytes, request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, headers=meta.get("headers", {}), content=body, request=request)
+
+
+async def cached_get(
+    client: httpx.AsyncClient,
+    url: str,
+    source: str,
+    headers: Optional[Dict[str, str]] = None,
+    params: Optional[Dict[str, Any]] = None,
+    vary: str = "",
+) -> httpx.Response:
+    """
+    GET through the on-disk cache.
+
+    Fresh entries (younger than the source's TTL) are returned without a
+    request. Stale entries are revalidated with If-None-Match /
+    If-Modified-Since; a 304 reuses the stored body. `vary` partitions the
+    cache — pass a credentials fingerprint, never the raw secret.
+    """
+    if not CACHE_ENABLED:
+        return await client.get(url, headers=headers, params=params)
+
+    key = _key(url, params, vary)
+    entry = _load(key)
+    request = client.build_request("GET", url, headers=headers, params=params)
+
+    if entry is not None:
+        meta, body = entry
+        if time.time() - meta["stored_at"] < SOURCE_TTLS.get(source, 0):
+            _bump(source, hits=1, bytes_saved=len(body))
+            return _from_cache(meta, body, request)
+        validators = meta.get("headers", {})
+        if validators.get("etag"):
+            request.headers["If-None-Match"] = validators["etag"]
+        if validators.get("last-modified"):
+            request.headers["If-Modified-Since"] = validators["last-modified"]
+
+    started = time.monotonic()
+    resp = await client.send(request)
+    elapsed = time.monotonic() - started
+
+    if resp.status_code == 304 and entry is not None:
+        meta, body = entry
+        meta["stored_at"] = time.time()
+        _store(key, meta, None)
+        _bump(source, revalidated=1, bytes_saved=len(body), fetch_seconds=elapsed)
+        return _from_cache(meta, body, request)
+
+    if resp.status_code == 200:
+        meta = {
+            "stored_at": time.time(),
+            "headers": {h: resp.headers[h] for h in _KEPT_HEADERS if h in resp.headers},
+        }
+        _store(key, meta, resp.content)
+        _bump(source, misses=1, bytes_fetched=len(resp.content), fetch_seconds=elapsed)
+    return resp
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Per-source counters. latency_saved_s estimates the time avoided on fresh
+    hits from the average duration of requests that did go upstream.
+    """
+    with _lock:
+        snapshot = {src: dict(s) for src, s in _stats.items()}
+    for s in snapshot.values():
+        upstream = s["misses"] + s["revalidated"]
+        avg = s["fetch_seconds"] / upstream if upstream else 0.0
+        s["latency_saved_s"] = round(avg * s["hits"], 3)
+    return snapshot
+
+
+def clear_cache() -> None:
+    """Delete every stored response and reset counters."""
+    import shutil
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
+    with _lock:
+        _stats.clear()
@@ -0,0 +1,85 @@
+"""Request coalescing — concurrent runs asking for the same source data share one fetch."""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Tuple
+
+from agent.sources.cache import fingerprint
+from agent.sources.singleflight import SingleFlight
+
+# How long a finished fetch result is handed to later callers without refetching.
+# Short enough that it only spans runs fired in the same scheduler tick.
+RESULT_TTL = 30  # seconds
+
+_flight = SingleFlight()
+_recent: Dict[Tuple[str, str, str], Tuple[float, Any]] = {}
+_stats: Dict[str, int] = {"calls": 0, "upstream": 0, "cache_hits": 0}
+_lock = threading.Lock()
+
+
+def source_key(
+    source: str, credentials: Iterable[str], params: Dict[str, Any],
+) -> Tuple[str, str, str]:
+    """(source, credentials fingerprint, canonical params) — never holds raw secrets."""
+    creds = fingerprint("\x00".join(credentials))
+    return source, creds, json.dumps(params, sort_keys=True, default=str)
+
+
+def _fresh(key: Tuple[str, str, str], ttl: float) -> Tuple[bool, Any]:
+    with _lock:
+        entry = _recent.get(key)
+    if entry and time.monotonic() - entry[0] < ttl:
+        return True, entry[1]
+    return False, None
+
+
+async def coalesced(
+    source: str,
+    credentials: Iterable[str],
+    params: Dict[str, Any],
+    factory: Callable[[], Awaitable[Any]],
+    ttl: float = RESULT_TTL,
+) -> Any:
+    """
+    Run `factory()` at most once per key at a time. Callers arriving while it
+    is in flight await the same result; callers within `ttl` seconds of it
+    finishing get the stored result. Errors are shared but never stored.
+
+    The result object is shared between callers and must not be mutated.
+    """
+    key = source_key(source, credentials, params)
+    with _lock:
+        _stats["calls"] += 1
+
+    hit, value = _fresh(key, ttl)
+    if hit:
+        with _lock:
+            _stats["cache_hits"] += 1
+        return value
+
+    async def _run() -> Any:
+        hit, value = _fresh(key, ttl)
+        if hit:
+            return value
+        with _lock:
+            _stats["upstream"] += 1
+        result = await factory()
+        now = time.monotonic()
+        with _lock:
+            for k in [k for k, (t, _) in _recent.items() if now - t >= max(ttl, RESULT_TTL)]:
+                del _recent[k]
+            _recent[key] = (now, result)
+        return result
+
+    return await _flight.do(key, _run)
+
+
+def coalesce_stats() -> Dict[str, int]:
+    """calls, upstream fetches, short-lived cache hits and in-flight joins."""
+    with _lock:
+        s = dict(_stats)
+    s["joined"] = max(0, s["calls"] - s["upstream"] - s["cache_hits"])
+    s["in_flight"] = _flight.in_flight()
+    return s
@@ -0,0 +1,141 @@
+"""Shared HTTP client registry — one keep-alive pool per upstream host."""
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import threading
+import weakref
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from agent.sources.ratelimit import RateLimitedTransport
+from agent.sources.resilience import ResilientTransport
+
+# HTTP/2 needs the optional `h2` package (installed via `httpx[http2]`).
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_config: Dict[str, Any] = {
+    "max_connections":           20,
+    "max_keepalive_connections": 10,
+    "keepalive_expiry":          60.0,
+    "timeout":                   15.0,
+    "http2":                     HTTP2_AVAILABLE,
+}
+
+# {event loop: {host: AsyncClient}} — an AsyncClient's pool is bound to the
+# loop it first ran on, so clients are shared per loop and dropped with it.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, httpx.AsyncClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+_stats: Dict[str, Dict[str, int]] = {}
+_lock = threading.Lock()
+
+
+def configure(**limits: Any) -> None:
+    """
+    Override pool settings for clients created from now on.
+    Keys: max_connections, max_keepalive_connections, keepalive_expiry,
+          timeout, http2.
+    """
+    unknown = set(limits) - set(_config)
+    if unknown:
+        raise ValueError(f"Unknown HTTP pool setting(s): {', '.join(sorted(unknown))}")
+    if limits.get("http2") and not HTTP2_AVAILABLE:
+        raise ValueError("HTTP/2 requested but the `h2` package is not installed.")
+    with _lock:
+        _config.update(limits)
+
+
+def _host_of(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+class _CountingTransport(httpx.AsyncBaseTransport):
+    """Wraps the real transport to count requests vs. newly opened connections."""
+
+    def __init__(self, host: str, inner: httpx.AsyncBaseTransport) -> None:
+        self._host = host
+        self._inner = inner
+
+    async def _trace(self, event: str, info: Dict[str, Any]) -> None:
+        if event == "connection.connect_tcp.complete":
+            _bump(self._host, "connections_opened")
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        _bump(self._host, "requests")
+        request.extensions["trace"] = self._trace
+        return await self._inner.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+def _bump(host: str, key: str) -> None:
+    with _lock:
+        host_stats = _stats.setdefault(host, {"requests": 0, "connections_opened": 0})
+        host_stats[key] += 1
+
+
+def _new_client(host: str) -> httpx.AsyncClient:
+    cfg = dict(_config)
+    limits = httpx.Limits(
+        max_connections=cfg["max_connections"],
+        max_keepalive_connections=cfg["max_keepalive_connections"],
+        keepalive_expiry=cfg["keepalive_expiry"],
+    )
+    inner = httpx.AsyncHTTPTransport(limits=limits, http2=cfg["http2"])
+    return httpx.AsyncClient(
+        transport=_CountingTransport(
+            host, ResilientTransport(host, RateLimitedTransport(host, inner)),
+        ),
+        timeout=cfg["timeout"],
+    )
+
+
+def get_client(url: str) -> httpx.AsyncClient:
+    """
+    Return the shared AsyncClient for the host of `url` on the running loop.
+    Must be called from inside a coroutine.
+    """
+    loop = asyncio.get_running_loop()
+    host = _host_of(url)
+    with _lock:
+        per_loop = _clients.setdefault(loop, {})
+        client = per_loop.get(host)
+        if client is None or client.is_closed:
+            client = per_loop[host] = _new_client(host)
+    return client
+
+
+async def aclose_clients() -> None:
+    """Close every pooled client bound to the running loop."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        per_loop = _clients.pop(loop, {})
+    for client in per_loop.values():
+        await client.aclose()
+
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Per-host connection reuse counters:
+    {host: {"requests", "connections_opened", "reused", "reuse_ratio"}}.
+    """
+    with _lock:
+        snapshot = {host: dict(s) for host, s in _stats.items()}
+    for s in snapshot.values():
+        s["reused"] = max(0, s["requests"] - s["connections_opened"])
+        s["reuse_ratio"] = round(s["reused"] / s["requests"], 3) if s["requests"] else 0.0
+    return snapshot
+
+
+def reset_stats() -> None:
+    with _lock:
+        _stats.clear()
+
+
+def client_for(url: str, client: Optional[httpx.AsyncClient] = None) -> httpx.AsyncClient:
+    """Use the caller-supplied client if given, else the pooled one for `url`."""
+    return client if client is not None else get_client(url)
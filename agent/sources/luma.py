@@ -1,14 +1,34 @@
 """Luma Events API — fetch and normalize upcoming events."""
+from __future__ import annotations
+
 import httpx
 from datetime import datetime, timezone, timedelta
+from typing import AsyncIterator, Iterable, Optional
+
+from agent.sources.cache import cached_get, fingerprint
+from agent.sources.http import client_for
 
 CALENDAR_ID = "cal-9Z75SHNwmRJPyWb"
 BASE_URL = "https://public-api.luma.com/v1/calendar/list-events"
+PAGE_LIMIT = 50     # events requested per page
+MAX_EVENTS = 200    # default cap on events pulled per run
 
 
-async def fetch_luma_events(api_key: str, days: int = 21) -> list[dict]:
-    """Fetch upcoming events from the CoSN Luma calendar."""
-    now = datetime.now(timezone.utc)
+async def stream_luma_events(
+    api_key: str, days: int = 21, max_events: int = MAX_EVENTS,
+    client: Optional[httpx.AsyncClient] = None,
+) -> AsyncIterator[dict]:
+    """
+    Yield upcoming events from the CoSN Luma calendar as each page lands,
+    following next_cursor until the window is exhausted or `max_events`
+    have been yielded.
+    client: optional AsyncClient; defaults to the shared pool for the Luma host.
+    """
+    # Window starts on the hour so consecutive runs send identical requests
+    # and can be answered by the response cache; events that started earlier
+    # in the hour are dropped here instead.
+    started_at = datetime.now(timezone.utc)
+    now = started_at.replace(minute=0, second=0, microsecond=0)
     cutoff = now + timedelta(days=days)
 
     params = {
@@ -16,60 +36,113 @@ async def fetch_luma_events(api_key: str, days: int = 21) -> list[dict]:
         "before": cutoff.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
         "sort_column": "start_at",
         "sort_direction": "asc",
-        "pagination_limit": 10,
+        "pagination_limit": min(PAGE_LIMIT, max_events),
     }
 
-    async with httpx.AsyncClient(timeout=15) as client:
-        resp = await client.get(
-            BASE_URL,
+    client = client_for(BASE_URL, client)
+    yielded = 0
+    while yielded < max_events:
+        resp = await cached_get(
+            client, BASE_URL, "luma",
             headers={"accept": "application/json", "x-luma-api-key": api_key},
             params=params,
+            vary=fingerprint(api_key),
         )
         resp.raise_for_status()
         data = resp.json()
 
-    events = [entry.get("event", {}) for entry in data.get("entries", [])]
-    return events
+        for entry in data.get("entries", []):
+            event = entry.get("event", {})
+            if _started_before(event, started_at):
+                continue
+            yield event
+            yielded += 1
+            if yielded >= max_events:
+                return
 
+        cursor = data.get("next_cursor")
+        if not data.get("has_more") or not cursor:
+            return
+        params["pagination_cursor"] = cursor
 
-def normalize_luma(events: list[dict], days: int = 21) -> str:
-    header = f"UPCOMING EVENTS (next {days} days)"
-    if not events:
-        return f"{header}\nNo upcoming events found.\n"
 
+def _started_before(event: dict, moment: datetime) -> bool:
+    try:
+        start = datetime.fromisoformat(event.get("start_at", "").replace("Z", "+00:00"))
+    except ValueError:
+        return False  # undated events are kept
+    return start < moment
+
+
+async def fetch_luma_events(
+    api_key: str, days: int = 21, client: Optional[httpx.AsyncClient] = None,
+    max_events: int = MAX_EVENTS,
+) -> list[dict]:
+    """Fetch upcoming events from the CoSN Luma calendar as one list."""
+    return [event async for event in stream_luma_events(api_key, days, max_events, client)]
+
+
+def _event_lines(i: int, event: dict) -> list[str]:
+    title = event.get("name", "Untitled Event")
+    start_at = event.get("start_at", "")
+    url = event.get("url", "")
+    description = event.get("description", "") or ""
+
+    geo = event.get("geo_address_info") or {}
+    location = (
+        geo.get("city_state")
+        or geo.get("city")
+        or geo.get("description")
+        or "Online"
+    )
+
+    if start_at:
+        try:
+            dt = datetime.fromisoformat(start_at.replace("Z", "+00:00"))
+            date_str = dt.strftime("%b %d, %Y at %I:%M %p UTC")
+        except ValueError:
+            date_str = start_at
+    else:
+        date_str = "TBD"
+
+    desc_preview = description[:200].strip()
+    if len(description) > 200:
+        desc_preview += "…"
+
+    lines = [f"{i}. {title} — {date_str} | {location}"]
+    if desc_preview:
+        lines.append(f"   {desc_preview}")
+    if url:
+        lines.append(f"   Register: {url}")
+    lines.append("")
+    return lines
+
+
+def normalize_luma(events: Iterable[dict], days: int = 21) -> str:
+    header = f"UPCOMING EVENTS (next {days} days)"
     lines = [header]
     for i, event in enumerate(events, 1):
-        title = event.get("name", "Untitled Event")
-        start_at = event.get("start_at", "")
-        url = event.get("url", "")
-        description = event.get("description", "") or ""
-
-        geo = event.get("geo_address_info") or {}
-        location = (
-            geo.get("city_state")
-            or geo.get("city")
-            or geo.get("description")
-            or "Online"
-        )
-
-        if start_at:
-            try:
-                dt = datetime.fromisoformat(start_at.replace("Z", "+00:00"))
-                date_str = dt.strftime("%b %d, %Y at %I:%M %p UTC")
-            except ValueError:
-                date_str = start_at
-        else:
-            date_str = "TBD"
-
-        desc_preview = description[:200].strip()
-        if len(description) > 200:
-            desc_preview += "…"
-
-        lines.append(f"{i}. {title} — {date_str} | {location}")
-        if desc_preview:
-            lines.append(f"   {desc_preview}")
-        if url:
-            lines.append(f"   Register: {url}")
-        lines.append("")
+        lines.extend(_event_lines(i, event))
 
+    if len(lines) == 1:
+        return f"{header}\nNo upcoming events found.\n"
     return "\n".join(lines)
+
+
+async def normalize_luma_stream(
+    events: AsyncIterator[dict], days: int = 21,
+) -> tuple[str, int]:
+    """
+    Normalize events as they stream in, keeping only the rendered lines
+    rather than the raw event payloads. Returns (text, event_count).
+    """
+    header = f"UPCOMING EVENTS (next {days} days)"
+    lines = [header]
+    count = 0
+    async for event in events:
+        count += 1
+        lines.extend(_event_lines(count, event))
+
+    if not count:
+        return f"{header}\nNo upcoming events found.\n", 0
+    return "\n".join(lines), count
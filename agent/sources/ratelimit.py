@@ -0,0 +1,172 @@
+"""Per-host token-bucket rate limiting with 429 / Retry-After handling."""
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Tuple
+
+import httpx
+
+# host → (sustained requests per second, burst size)
+HOST_LIMITS: Dict[str, Tuple[float, int]] = {
+    "api.webflow.com":      (1.0, 10),   # 60 req/min on most plans
+    "api.spotify.com":      (5.0, 10),
+    "accounts.spotify.com": (1.0, 5),
+    "public-api.luma.com":  (5.0, 10),
+}
+DEFAULT_LIMIT: Tuple[float, int] = (10.0, 20)
+
+# Rate-limit headers describe a per-minute window on the APIs we call.
+HEADER_WINDOW = 60.0  # seconds
+
+MAX_THROTTLE_RETRIES = 5
+MAX_RETRY_AFTER = 120.0  # seconds — never park a request longer than this per attempt
+
+
+class TokenBucket:
+    """
+    Reservation-style token bucket. reserve() always succeeds and returns how
+    long the caller must wait, so requests queue in arrival order instead of
+    failing. Rate and tokens adapt to the server's X-RateLimit-* headers.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+        self.stats: Dict[str, float] = {
+            "requests": 0, "throttled": 0, "queued": 0, "queue_depth": 0,
+            "max_queue_depth": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0,
+        }
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            wait = max(0.0, -self.tokens / self.rate, self.blocked_until - now)
+            self.stats["requests"] += 1
+            return wait
+
+    def block_for(self, seconds: float) -> None:
+        """Pause the whole host, e.g. after a 429 with Retry-After."""
+        with self._lock:
+            now = time.monotonic()
+            self.blocked_until = max(self.blocked_until, now + seconds)
+            self._refill(now)
+            self.tokens = min(self.tokens, 0.0)
+            self.stats["throttled"] += 1
+
+    def observe(self, headers: httpx.Headers) -> None:
+        """Adapt to the server's view of our remaining budget."""
+        try:
+            remaining = int(headers["x-ratelimit-remaining"])
+        except (KeyError, ValueError):
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, float(remaining))
+            try:
+                limit = int(headers["x-ratelimit-limit"])
+                self.rate = max(limit / HEADER_WINDOW, 0.01)
+                self.burst = max(1, min(self.burst, limit))
+            except (KeyError, ValueError):
+                pass
+
+    def _track_wait(self, delta: int, waited: float = 0.0) -> None:
+        with self._lock:
+            s = self.stats
+            s["queue_depth"] += delta
+            s["max_queue_depth"] = max(s["max_queue_depth"], s["queue_depth"])
+            if delta < 0:
+                s["queued"] += 1
+                s["wait_seconds"] += waited
+                s["max_wait_seconds"] = max(s["max_wait_seconds"], waited)
+
+    async def acquire(self) -> None:
+        wait = self.reserve()
+        if wait <= 0:
+            return
+        self._track_wait(+1)
+        try:
+            await asyncio.sleep(wait)
+        finally:
+            self._track_wait(-1, wait)
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_lock = threading.Lock()
+
+
+def bucket_for(host: str) -> TokenBucket:
+    with _lock:
+        bucket = _buckets.get(host)
+        if bucket is None:
+            bucket = _buckets[host] = TokenBucket(*HOST_LIMITS.get(host, DEFAULT_LIMIT))
+        return bucket
+
+
+def _retry_after(resp: httpx.Response, attempt: int) -> float:
+    raw = resp.headers.get("retry-after")
+    if raw:
+        try:
+            return min(MAX_RETRY_AFTER, max(0.0, float(raw)))
+        except ValueError:
+            try:
+                delay = parsedate_to_datetime(raw).timestamp() - time.time()
+                return min(MAX_RETRY_AFTER, max(0.0, delay))
+            except (TypeError, ValueError):
+                pass
+    # No usable header: exponential backoff with jitter
+    return min(MAX_RETRY_AFTER, (2 ** attempt) + random.random())
+
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """Queues requests behind the host's bucket and retries 429s after Retry-After."""
+
+    def __init__(self, host: str, inner: httpx.AsyncBaseTransport) -> None:
+        self._bucket = bucket_for(host)
+        self._inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        attempt = 0
+        while True:
+            await self._bucket.acquire()
+            resp = await self._inner.handle_async_request(request)
+            self._bucket.observe(resp.headers)
+            if resp.status_code != 429 or attempt >= MAX_THROTTLE_RETRIES:
+                return resp
+            delay = _retry_after(resp, attempt)
+            await resp.aclose()
+            self._bucket.block_for(delay)
+            attempt += 1
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+def limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Per-host limiter metrics: current and max queue depth, how many requests
+    waited and for how long, 429s seen, and the current adaptive rate.
+    """
+    with _lock:
+        buckets = dict(_buckets)
+    out: Dict[str, Dict[str, Any]] = {}
+    for host, bucket in buckets.items():
+        with bucket._lock:
+            s = dict(bucket.stats)
+            s["rate_per_s"] = round(bucket.rate, 3)
+        s["avg_wait_seconds"] = round(s["wait_seconds"] / s["queued"], 3) if s["queued"] else 0.0
+        out[host] = s
+    return out
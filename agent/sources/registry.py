@@ -0,0 +1,100 @@
+"""Source plugins — the fetch/normalize contract and the registry the runner iterates."""
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from agent.sources.coalesce import coalesced, source_key
+from agent.sources.resilience import breaker
+
+# Per-task keys that steer how a source is run rather than what it fetches,
+# so they stay out of cache and coalescing keys.
+RUN_OPTIONS = ("enabled", "snapshot_window")
+
+
+class Source:
+    """
+    Base class for a data source. Subclasses set the class attributes and
+    implement fetch() and normalize(); everything else has working defaults.
+
+    name:        key under task["sources"]
+    label:       display name used in sources_used
+    icon:        emoji shown in the task table
+    context_arg: assemble_context keyword for the text; empty means the text is
+                 appended as an extra data section
+    defaults:    per-task config (besides "enabled") for new tasks
+    """
+
+    name: str = ""
+    label: str = ""
+    icon: str = ""
+    context_arg: str = ""
+    defaults: Dict[str, Any] = {}
+
+    def credentials(self, api_config: Dict[str, str]) -> List[str]:
+        """api_config values this source authenticates with (fingerprinted, never stored)."""
+        return []
+
+    def is_configured(self, api_config: Dict[str, str]) -> bool:
+        return all(self.credentials(api_config))
+
+    def params(self, cfg: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in cfg.items() if k not in RUN_OPTIONS}
+
+    def cache_key(self, cfg: Dict[str, Any], api_config: Dict[str, str]) -> Hashable:
+        return source_key(self.name, self.credentials(api_config), self.params(cfg))
+
+    def cost(self, cfg: Dict[str, Any]) -> float:
+        """Rough number of upstream requests one fetch costs."""
+        return 1.0
+
+    async def fetch(self, cfg: Dict[str, Any], api_config: Dict[str, str]) -> Any:
+        raise NotImplementedError
+
+    def normalize(self, raw: Any, cfg: Dict[str, Any]) -> Tuple[str, str]:
+        """Return (context text, short summary for sources_used)."""
+        raise NotImplementedError
+
+    async def load(self, cfg: Dict[str, Any], api_config: Dict[str, str]) -> Tuple[str, str]:
+        """
+        Fetch through the shared machinery (coalescing + circuit breaker) and
+        normalize as soon as this source's data is in.
+        """
+        raw = await coalesced(
+            self.name, self.credentials(api_config), self.params(cfg),
+            lambda: breaker(self.name).call(lambda: self.fetch(cfg, api_config)),
+        )
+        return self.normalize(raw, cfg)
+
+
+_registry: Dict[str, Source] = {}
+_lock = threading.Lock()
+
+
+def register(source: Source) -> Source:
+    """Add (or replace) a source. Registration order is context order."""
+    if not source.name:
+        raise ValueError("Source plugins need a name.")
+    with _lock:
+        _registry[source.name] = source
+    return source
+
+
+def all_sources() -> List[Source]:
+    with _lock:
+        return list(_registry.values())
+
+
+def get_source(name: str) -> Optional[Source]:
+    with _lock:
+        return _registry.get(name)
+
+
+def default_sources() -> Dict[str, Dict[str, Any]]:
+    """Fresh task["sources"] mapping with every registered source disabled."""
+    return {s.name: {"enabled": False, **s.defaults} for s in all_sources()}
+
+
+# Built-ins register first so they lead the context; imported last because
+# they subclass Source.
+import agent.sources.builtin  # noqa: E402,F401
@@ -0,0 +1,257 @@
+"""Resilience for source fetches — retries, hedged requests, circuit breakers, deadlines."""
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, Optional, Tuple
+
+import httpx
+
+# Whole fetch stage of a run; sources still pending are dropped from the run.
+FETCH_DEADLINE = 20.0  # seconds
+
+# Retries on idempotent requests only (a retried POST could apply twice).
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.25  # seconds
+RETRY_MAX_DELAY = 4.0
+RETRY_STATUSES = frozenset({500, 502, 503, 504})
+
+# Hedging: if a GET is still waiting past the host's observed p95 latency,
+# send a duplicate and take whichever answers first.
+HEDGE_REQUESTS = os.getenv("COSN_HEDGE_REQUESTS", "0") == "1"
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MIN_DELAY = 0.05  # seconds — never hedge faster than this
+
+# Circuit breaker: this many consecutive failures open the circuit; after the
+# cool-down one trial call is let through (half-open).
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN = 60.0  # seconds
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+
+def is_upstream_failure(exc: BaseException) -> bool:
+    """
+    Whether `exc` says the upstream itself is unhealthy: transport errors,
+    timeouts, 5xx and 429. Other errors — 401/403/404 from a bad key or id,
+    missing data — belong to one task's configuration and must not trip a
+    breaker shared by every task using the source.
+    """
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return status >= 500 or status == 429
+    return isinstance(exc, (httpx.TransportError, asyncio.TimeoutError, TimeoutError))
+
+
+# ── Latency tracking ──────────────────────────────────────────────────────────
+
+_latencies: Dict[str, Deque[float]] = {}
+_counters: Dict[str, Dict[str, int]] = {}
+_lock = threading.Lock()
+
+
+def _record(host: str, seconds: float) -> None:
+    with _lock:
+        _latencies.setdefault(host, deque(maxlen=200)).append(seconds)
+
+
+def _bump(host: str, key: str) -> None:
+    with _lock:
+        c = _counters.setdefault(host, {"retries": 0, "hedged": 0, "hedge_wins": 0})
+        c[key] += 1
+
+
+def p95(host: str) -> float:
+    """Observed p95 latency for `host`, or 0.0 until enough samples exist."""
+    with _lock:
+        samples = sorted(_latencies.get(host, ()))
+    if len(samples) < HEDGE_MIN_SAMPLES:
+        return 0.0
+    return samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+
+def _backoff(attempt: int) -> float:
+    """Full-jitter exponential backoff."""
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt)))
+
+
+class ResilientTransport(httpx.AsyncBaseTransport):
+    """
+    Retries idempotent requests on transport errors and 5xx with jittered
+    backoff, and optionally hedges slow GETs. Sits above the rate limiter so
+    retries and hedges spend the host's budget like any other request.
+    """
+
+    def __init__(self, host: str, inner: httpx.AsyncBaseTransport) -> None:
+        self._host = host
+        self._inner = inner
+
+    async def _send(self, request: httpx.Request) -> httpx.Response:
+        started = time.monotonic()
+        resp = await self._inner.handle_async_request(request)
+        _record(self._host, time.monotonic() - started)
+        return resp
+
+    async def _hedged(self, request: httpx.Request) -> httpx.Response:
+        threshold = p95(self._host)
+        if not (HEDGE_REQUESTS and request.method == "GET" and threshold):
+            return await self._send(request)
+
+        primary = asyncio.ensure_future(self._send(request))
+        done, _ = await asyncio.wait({primary}, timeout=max(threshold, HEDGE_MIN_DELAY))
+        if done:
+            return primary.result()
+
+        _bump(self._host, "hedged")
+        hedge = asyncio.ensure_future(self._send(request))
+        pending = {primary, hedge}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for fut in done:
+                    if fut.exception() is None:
+                        if fut is hedge:
+                            _bump(self._host, "hedge_wins")
+                        for other in done - {fut}:
+                            if other.exception() is None:
+                                await other.result().aclose()
+                        return fut.result()
+            return primary.result()  # both failed — surface the primary's error
+        finally:
+            for fut in pending:
+                fut.cancel()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method not in IDEMPOTENT_METHODS:
+            return await self._send(request)
+
+        attempt = 0
+        while True:
+            try:
+                resp = await self._hedged(request)
+            except httpx.TransportError:
+                if attempt >= RETRY_ATTEMPTS:
+                    raise
+            else:
+                if resp.status_code not in RETRY_STATUSES or attempt >= RETRY_ATTEMPTS:
+                    return resp
+                await resp.aclose()
+            _bump(self._host, "retries")
+            await asyncio.sleep(_backoff(attempt))
+            attempt += 1
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+# ── Circuit breakers ──────────────────────────────────────────────────────────
+
+class CircuitBreaker:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self.failures < BREAKER_THRESHOLD:
+                return "closed"
+            if time.monotonic() - self.opened_at >= BREAKER_COOLDOWN:
+                return "half-open"
+            return "open"
+
+    def _admit(self) -> None:
+        with self._lock:
+            if self.failures < BREAKER_THRESHOLD:
+                return
+            remaining = BREAKER_COOLDOWN - (time.monotonic() - self.opened_at)
+            if remaining > 0 or self.trial_in_flight:
+                raise CircuitOpenError(
+                    f"{self.name} is failing; skipping for {max(0, int(remaining))}s"
+                )
+            self.trial_in_flight = True
+
+    def _settle(self, ok: Optional[bool]) -> None:
+        """ok=None: the call neither proves nor disproves the upstream's health."""
+        with self._lock:
+            self.trial_in_flight = False
+            if ok is None:
+                return
+            if ok:
+                self.failures = 0
+            else:
+                self.failures += 1
+                if self.failures >= BREAKER_THRESHOLD:
+                    self.opened_at = time.monotonic()
+
+    async def call(self, factory: Callable[[], Awaitable[Any]]) -> Any:
+        self._admit()
+        try:
+            result = await factory()
+        except asyncio.CancelledError:
+            self._settle(None)  # a deadline on our side says nothing about the upstream
+            raise
+        except Exception as exc:
+            self._settle(False if is_upstream_failure(exc) else None)
+            raise
+        self._settle(True)
+        return result
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def breaker(name: str) -> CircuitBreaker:
+    with _lock:
+        b = _breakers.get(name)
+        if b is None:
+            b = _breakers[name] = CircuitBreaker(name)
+        return b
+
+
+# ── Deadlines ─────────────────────────────────────────────────────────────────
+
+async def gather_with_deadline(
+    coros: Iterable[Tuple[str, Awaitable[Any]]], deadline: float = FETCH_DEADLINE,
+) -> Dict[str, Any]:
+    """
+    Run named awaitables concurrently for at most `deadline` seconds.
+    Returns {name: result or exception}; anything still running is cancelled
+    and reported as asyncio.TimeoutError.
+    """
+    tasks = {name: asyncio.ensure_future(c) for name, c in coros}
+    if not tasks:
+        return {}
+    done, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+    for t in pending:
+        t.cancel()
+
+    out: Dict[str, Any] = {}
+    for name, t in tasks.items():
+        if t in done:
+            out[name] = t.exception() or t.result()
+        else:
+            out[name] = asyncio.TimeoutError(f"timed out after {deadline:g}s")
+    return out
+
+
+def resilience_stats() -> Dict[str, Any]:
+    """Per-host retries/hedges with current p95, and per-source breaker states."""
+    with _lock:
+        hosts = {h: dict(c) for h, c in _counters.items()}
+        names = list(_breakers)
+        known = set(_latencies)
+    for host in known:
+        hosts.setdefault(host, {"retries": 0, "hedged": 0, "hedge_wins": 0})
+        hosts[host]["p95_s"] = round(p95(host), 3)
+    return {"hosts": hosts, "breakers": {n: breaker(n).state for n in names}}
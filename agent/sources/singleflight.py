@@ -0,0 +1,57 @@
+"""Single-flight — concurrent callers with the same key share one in-flight call."""
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Set
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent async calls by key. The first caller starts the
+    factory as a detached task; everyone who arrives while it is in flight
+    awaits the same result. Safe across threads and event loops: the shared
+    handle is a concurrent.futures.Future, which any loop can await via
+    wrap_future. Cancelling one caller (e.g. on a deadline) never cancels
+    the shared work for the others.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, concurrent.futures.Future] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._inflight)
+
+    async def _run(
+        self, key: Hashable, fut: concurrent.futures.Future,
+        factory: Callable[[], Awaitable[Any]],
+    ) -> None:
+        try:
+            result = await factory()
+        except BaseException as exc:
+            fut.set_exception(exc)
+        else:
+            fut.set_result(result)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        with self._lock:
+            fut = self._inflight.get(key)
+            leader = fut is None
+            if leader:
+                fut = self._inflight[key] = concurrent.futures.Future()
+                # Mark running so a cancelled waiter can't cancel the shared future.
+                fut.set_running_or_notify_cancel()
+
+        if leader:
+            task = asyncio.get_running_loop().create_task(self._run(key, fut, factory))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        return await asyncio.wrap_future(fut)
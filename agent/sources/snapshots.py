@@ -0,0 +1,82 @@
+"""Stale-while-revalidate snapshots of normalized source data."""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+# Seconds a snapshot may be served as-is (while a refresh runs in the
+# background). Older snapshots are ignored and the run fetches live.
+SNAPSHOT_WINDOWS: Dict[str, int] = {
+    "luma":          600,
+    "spotify":       1800,
+    "webflow":       600,
+    "webflow_blogs": 600,
+}
+
+# {key: (stored_at wall time, value)}
+_snapshots: Dict[Hashable, Tuple[float, Any]] = {}
+_refreshing: Set[Hashable] = set()
+_background: Set[asyncio.Task] = set()
+_lock = threading.Lock()
+
+
+def _store(key: Hashable, value: Any) -> None:
+    with _lock:
+        _snapshots[key] = (time.time(), value)
+
+
+async def _refresh(key: Hashable, loader: Callable[[], Awaitable[Any]]) -> None:
+    try:
+        _store(key, await loader())
+    except Exception:
+        pass  # keep serving the old snapshot; the next blocking load surfaces errors
+    finally:
+        with _lock:
+            _refreshing.discard(key)
+
+
+def _schedule_refresh(key: Hashable, loader: Callable[[], Awaitable[Any]]) -> None:
+    with _lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+    task = asyncio.get_running_loop().create_task(_refresh(key, loader))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+async def load(
+    source: str,
+    key: Hashable,
+    loader: Callable[[], Awaitable[Any]],
+    window: Optional[float] = None,
+) -> Tuple[Any, Optional[float]]:
+    """
+    Return (value, age_seconds). A snapshot within the source's freshness
+    window is returned immediately and refreshed in the background (one
+    refresh per key at a time). Otherwise `loader()` is awaited and its result
+    stored; age is None for live data.
+
+    Background refreshes run on the calling loop, so it must outlive the run
+    (the runner's long-lived I/O loop does).
+    """
+    if window is None:
+        window = SNAPSHOT_WINDOWS.get(source, 0)
+    with _lock:
+        snap = _snapshots.get(key)
+    if snap is not None:
+        age = time.time() - snap[0]
+        if age <= window:
+            _schedule_refresh(key, loader)
+            return snap[1], age
+
+    value = await loader()
+    _store(key, value)
+    return value, None
+
+
+def clear_snapshots() -> None:
+    with _lock:
+        _snapshots.clear()
@@ -2,28 +2,88 @@
 from __future__ import annotations
 
 import base64
+import threading
+import time
 import httpx
 from datetime import datetime, timezone, timedelta
-from typing import Optional
+from typing import Dict, Optional, Tuple
+
+from agent.sources.cache import cached_get
+from agent.sources.http import client_for
+from agent.sources.singleflight import SingleFlight
 
 SHOW_ID = "0mroNmOfEqWdkPEYYtN3PF"
 TOKEN_URL = "https://accounts.spotify.com/api/token"
 EPISODES_URL = f"https://api.spotify.com/v1/shows/{SHOW_ID}/episodes"
 
+# Refresh this many seconds before Spotify's expires_in so no request races expiry.
+TOKEN_REFRESH_MARGIN = 300
+
+# {client_id: (access_token, monotonic refresh-at)}
+_tokens: Dict[str, Tuple[str, float]] = {}
+_tokens_lock = threading.Lock()
+_token_flight = SingleFlight()
 
-async def _get_token(client_id: str, client_secret: str) -> str:
+
+def _cached_token(client_id: str) -> Optional[str]:
+    with _tokens_lock:
+        entry = _tokens.get(client_id)
+    if entry and time.monotonic() < entry[1]:
+        return entry[0]
+    return None
+
+
+def invalidate_token(client_id: str, token: Optional[str] = None) -> None:
+    """
+    Drop the cached token, e.g. after the API rejected it with a 401.
+    If `token` is given, only drop it if it is still the cached one, so a
+    late 401 can't evict a token another task has just refreshed.
+    """
+    with _tokens_lock:
+        entry = _tokens.get(client_id)
+        if entry and (token is None or entry[0] == token):
+            del _tokens[client_id]
+
+
+async def _get_token(
+    client_id: str, client_secret: str, client: Optional[httpx.AsyncClient] = None,
+) -> str:
+    """
+    Return a cached client-credentials token, refreshing it shortly before it
+    expires. Concurrent callers for the same client_id share one refresh.
+    """
+    token = _cached_token(client_id)
+    if token:
+        return token
+
+    async def _refresh() -> str:
+        # Another flight may have refreshed while we were queued behind the lock.
+        fresh = _cached_token(client_id)
+        return fresh or await _request_token(client_id, client_secret, client)
+
+    return await _token_flight.do(client_id, _refresh)
+
+
+async def _request_token(
+    client_id: str, client_secret: str, client: Optional[httpx.AsyncClient] = None,
+) -> str:
     credentials = base64.b64encode(f"{client_id}:{client_secret}".encode()).decode()
-    async with httpx.AsyncClient(timeout=10) as client:
-        resp = await client.post(
-            TOKEN_URL,
-            headers={
-                "Authorization": f"Basic {credentials}",
-                "Content-Type": "application/x-www-form-urlencoded",
-            },
-            data={"grant_type": "client_credentials"},
-        )
-        resp.raise_for_status()
-        return resp.json()["access_token"]
+    resp = await client_for(TOKEN_URL, client).post(
+        TOKEN_URL,
+        headers={
+            "Authorization": f"Basic {credentials}",
+            "Content-Type": "application/x-www-form-urlencoded",
+        },
+        data={"grant_type": "client_credentials"},
+        timeout=10,
+    )
+    resp.raise_for_status()
+    payload = resp.json()
+    token = payload["access_token"]
+    ttl = max(0, int(payload.get("expires_in", 3600)) - TOKEN_REFRESH_MARGIN)
+    with _tokens_lock:
+        _tokens[client_id] = (token, time.monotonic() + ttl)
+    return token
 
 
 def _parse_release_date(release_date: str) -> Optional[datetime]:
@@ -39,20 +99,33 @@ def _parse_release_date(release_date: str) -> Optional[datetime]:
 
 
 async def fetch_spotify_episodes(
-    client_id: str, client_secret: str, days: int = 7
+    client_id: str, client_secret: str, days: int = 7,
+    client: Optional[httpx.AsyncClient] = None,
 ) -> list[dict]:
-    """Fetch recent CoSN podcast episodes from Spotify."""
-    token = await _get_token(client_id, client_secret)
+    """
+    Fetch recent CoSN podcast episodes from Spotify.
+    client: optional AsyncClient used for both the token and episode calls;
+            defaults to the shared per-host pools.
+    """
     cutoff = datetime.now(timezone.utc) - timedelta(days=days)
 
-    async with httpx.AsyncClient(timeout=15) as client:
-        resp = await client.get(
-            EPISODES_URL,
+    async def _get_episodes() -> tuple[str, httpx.Response]:
+        token = await _get_token(client_id, client_secret, client)
+        resp = await cached_get(
+            client_for(EPISODES_URL, client), EPISODES_URL, "spotify",
             headers={"Authorization": f"Bearer {token}"},
             params={"limit": 50, "market": "US"},
+            vary=client_id,
         )
-        resp.raise_for_status()
-        data = resp.json()
+        return token, resp
+
+    token, resp = await _get_episodes()
+    if resp.status_code == 401:
+        # Token revoked or expired early — drop it and retry once with a fresh one.
+        invalidate_token(client_id, token)
+        _, resp = await _get_episodes()
+    resp.raise_for_status()
+    data = resp.json()
 
     episodes: list[dict] = []
     for ep in data.get("items", []):
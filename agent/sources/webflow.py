@@ -1,8 +1,18 @@
 """Webflow CMS API — fetch and normalize job postings and blog posts."""
+from __future__ import annotations
+
+import asyncio
 import httpx
 from datetime import datetime, timezone, timedelta
+from typing import AsyncIterator, Optional
+
+from agent.sources.cache import cached_get, fingerprint
+from agent.sources import webflow_store
+from agent.sources.http import client_for
 
 WEBFLOW_BASE = "https://api.webflow.com/v2"
+PAGE_LIMIT = 100        # Webflow's maximum page size
+PAGE_CONCURRENCY = 4    # pages in flight at once per collection
 
 
 def _headers(api_key: str) -> dict:
@@ -13,35 +23,38 @@ def _headers(api_key: str) -> dict:
     }
 
 
-async def discover_jobs_collection(api_key: str) -> tuple[str, str, str]:
+async def discover_jobs_collection(
+    api_key: str, client: Optional[httpx.AsyncClient] = None,
+) -> tuple[str, str, str]:
     """
     Auto-discover the first Webflow site's domain and jobs collection ID.
     Returns (site_id, site_domain, collection_id).
     """
-    async with httpx.AsyncClient(timeout=15) as client:
-        # 1. List sites
-        sites_resp = await client.get(f"{WEBFLOW_BASE}/sites", headers=_headers(api_key))
-        sites_resp.raise_for_status()
-        sites = sites_resp.json().get("sites", [])
-        if not sites:
-            raise ValueError("No Webflow sites found for this API key.")
-
-        site = sites[0]
-        site_id = site["id"]
-        # Prefer a custom domain; fall back to defaultDomain
-        custom_domains = site.get("customDomains") or []
-        if custom_domains:
-            site_domain = custom_domains[0].get("url", "").lstrip("https://").lstrip("http://")
-        else:
-            site_domain = site.get("defaultDomain", "")
-
-        # 2. List collections
-        cols_resp = await client.get(
-            f"{WEBFLOW_BASE}/sites/{site_id}/collections",
-            headers=_headers(api_key),
-        )
-        cols_resp.raise_for_status()
-        collections = cols_resp.json().get("collections", [])
+    client = client_for(WEBFLOW_BASE, client)
+
+    # 1. List sites
+    sites_resp = await client.get(f"{WEBFLOW_BASE}/sites", headers=_headers(api_key))
+    sites_resp.raise_for_status()
+    sites = sites_resp.json().get("sites", [])
+    if not sites:
+        raise ValueError("No Webflow sites found for this API key.")
+
+    site = sites[0]
+    site_id = site["id"]
+    # Prefer a custom domain; fall back to defaultDomain
+    custom_domains = site.get("customDomains") or []
+    if custom_domains:
+        site_domain = custom_domains[0].get("url", "").lstrip("https://").lstrip("http://")
+    else:
+        site_domain = site.get("defaultDomain", "")
+
+    # 2. List collections
+    cols_resp = await client.get(
+        f"{WEBFLOW_BASE}/sites/{site_id}/collections",
+        headers=_headers(api_key),
+    )
+    cols_resp.raise_for_status()
+    collections = cols_resp.json().get("collections", [])
 
     if not collections:
         raise ValueError("No CMS collections found in the Webflow site.")
@@ -63,9 +76,127 @@ async def discover_jobs_collection(api_key: str) -> tuple[str, str, str]:
     return site_id, site_domain, jobs_col["id"]
 
 
+def _parse_dt(raw: object) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(str(raw).rstrip("Z")).replace(tzinfo=timezone.utc)
+    except (ValueError, AttributeError):
+        return None
+
+
+async def iter_collection_pages(
+    api_key: str, collection_id: str,
+    client: Optional[httpx.AsyncClient] = None,
+    concurrency: int = PAGE_CONCURRENCY,
+    stop_before: Optional[datetime] = None,
+) -> AsyncIterator[tuple[int, list[dict]]]:
+    """
+    Yield (offset, items) for every page of a collection as pages arrive.
+
+    The first page is fetched alone to read pagination.total; the remaining
+    offsets are then fetched concurrently, at most `concurrency` at a time,
+    and yielded in completion order.
+
+    stop_before: when set, pages are requested newest-first by lastPublished
+                 (the list-items endpoint only sorts by lastPublished, name or
+                 slug) and fetched in waves of `concurrency`; paging stops
+                 once a page's oldest published item is older than this
+                 time. Never-published items carry no stamp and are skipped
+                 by the check; pages that come back unsorted never trigger
+                 the stop, so the worst case is a full scan.
+    """
+    client = client_for(WEBFLOW_BASE, client)
+    url = f"{WEBFLOW_BASE}/collections/{collection_id}/items"
+    params: dict = {"limit": PAGE_LIMIT}
+    if stop_before is not None:
+        params.update(sortBy="lastPublished", sortOrder="desc")
+
+    async def _get(offset: int) -> dict:
+        resp = await cached_get(
+            client, url, "webflow",
+            headers=_headers(api_key),
+            params={**params, "offset": offset},
+            vary=fingerprint(api_key),
+        )
+        resp.raise_for_status()
+        return resp.json()
+
+    async def _page(offset: int) -> list[dict]:
+        return (await _get(offset)).get("items", [])
+
+    def _ends_before(items: list[dict]) -> bool:
+        stamps = [_parse_dt(item["lastPublished"]) for item in items if item.get("lastPublished")]
+        if not stamps or None in stamps:
+            return False
+        newest_first = all(a >= b for a, b in zip(stamps, stamps[1:]))
+        return newest_first and stamps[-1] < stop_before
+
+    first = await _get(0)
+    first_items = first.get("items", [])
+    yield 0, first_items
+
+    total = (first.get("pagination") or {}).get("total", len(first_items))
+    offsets = list(range(PAGE_LIMIT, total, PAGE_LIMIT))
+    if not offsets or (stop_before is not None and _ends_before(first_items)):
+        return
+
+    if stop_before is not None:
+        for i in range(0, len(offsets), concurrency):
+            wave = offsets[i:i + concurrency]
+            pages = await asyncio.gather(*(_page(o) for o in wave))
+            for offset, items in zip(wave, pages):
+                yield offset, items
+                if _ends_before(items):
+                    return
+        return
+
+    sem = asyncio.Semaphore(concurrency)
+
+    async def _bounded(offset: int) -> tuple[int, list[dict]]:
+        async with sem:
+            return offset, await _page(offset)
+
+    tasks = [asyncio.ensure_future(_bounded(o)) for o in offsets]
+    try:
+        for fut in asyncio.as_completed(tasks):
+            yield await fut
+    finally:
+        for t in tasks:
+            t.cancel()
+
+
+async def _collect_published(
+    pages: AsyncIterator[tuple[int, list[dict]]], date_field: str, cutoff: datetime,
+) -> list[dict]:
+    """
+    Filter pages as they stream in: drop drafts/archived items and anything
+    dated before `cutoff`. Returns survivors in collection order.
+    """
+    published: list[tuple[int, dict]] = []
+    async for offset, items in pages:
+        for i, item in enumerate(items):
+            if item.get("isArchived", False) or item.get("isDraft", False):
+                continue
+
+            # Use the collection's date field first, fall back to item-level createdOn
+            fd = item.get("fieldData") or {}
+            raw_date = fd.get(date_field) or item.get("createdOn", "")
+            if raw_date:
+                item_dt = _parse_dt(raw_date)
+                if item_dt is not None and item_dt < cutoff:
+                    continue  # unparseable dates fall through and are included
+
+            published.append((offset + i, item))
+
+    published.sort(key=lambda p: p[0])
+    return [item for _, item in published]
+
+
 async def fetch_webflow_jobs(
     api_key: str, collection_id: str = "", site_domain: str = "",
     days: int = 7, featured_first: bool = True,
+    client: Optional[httpx.AsyncClient] = None,
+    early_stop: bool = False,
+    incremental: bool = False,
 ) -> tuple[list[dict], str]:
     """
     Fetch published job postings from Webflow CMS.
@@ -77,38 +208,25 @@ async def fetch_webflow_jobs(
     days: only include jobs whose created_time (fieldData.date) or Webflow
           createdOn is within the last N days.
     featured_first: if True, sort featured jobs (fieldData.featured == True) first.
+    client: optional AsyncClient; defaults to the shared pool for the Webflow host.
+    early_stop: page newest-first by last publish and stop at the cutoff.
+                Only exact when fieldData.date is never later than the item's
+                last publish (e.g. dated on or before creation).
+    incremental: delta-sync the collection into the local store and answer
+                 from its index (newest first) instead of scanning every page.
     """
     if not collection_id:
-        _, site_domain, collection_id = await discover_jobs_collection(api_key)
-
-    async with httpx.AsyncClient(timeout=15) as client:
-        resp = await client.get(
-            f"{WEBFLOW_BASE}/collections/{collection_id}/items",
-            headers=_headers(api_key),
-            params={"limit": 100},
-        )
-        resp.raise_for_status()
-        items = resp.json().get("items", [])
+        _, site_domain, collection_id = await discover_jobs_collection(api_key, client)
 
     cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    if incremental:
+        await webflow_store.sync_collection(api_key, collection_id, "date", client)
+        return await webflow_store.query_items(collection_id, cutoff, featured_first), site_domain
 
-    published: list[dict] = []
-    for item in items:
-        if item.get("isArchived", False) or item.get("isDraft", False):
-            continue
-
-        # Use fieldData.date (created_time field) first, fall back to item-level createdOn
-        fd = item.get("fieldData") or {}
-        raw_date = fd.get("date") or item.get("createdOn", "")
-        if raw_date:
-            try:
-                item_dt = datetime.fromisoformat(str(raw_date).rstrip("Z")).replace(tzinfo=timezone.utc)
-                if item_dt < cutoff:
-                    continue
-            except (ValueError, AttributeError):
-                pass  # unparseable date — include the item
-
-        published.append(item)
+    pages = iter_collection_pages(
+        api_key, collection_id, client, stop_before=cutoff if early_stop else None,
+    )
+    published = await _collect_published(pages, "date", cutoff)
 
     # Featured jobs first when requested
     if featured_first:
@@ -120,6 +238,9 @@ async def fetch_webflow_jobs(
 async def fetch_webflow_blogs(
     api_key: str, collection_id: str, site_domain: str = "",
     days: int = 7, featured_first: bool = True,
+    client: Optional[httpx.AsyncClient] = None,
+    early_stop: bool = False,
+    incremental: bool = False,
 ) -> tuple[list[dict], str]:
     """
     Fetch published blog posts from a Webflow CMS collection.
@@ -127,35 +248,22 @@ async def fetch_webflow_blogs(
 
     days: only include posts whose publish-date is within the last N days.
     featured_first: if True, sort featured posts (fieldData.featured == True) first.
+    client: optional AsyncClient; defaults to the shared pool for the Webflow host.
+    early_stop: page newest-first by last publish and stop at the cutoff.
+                Only exact when publish-date is never later than the item's
+                last publish.
+    incremental: delta-sync the collection into the local store and answer
+                 from its index (newest first) instead of scanning every page.
     """
-    async with httpx.AsyncClient(timeout=15) as client:
-        resp = await client.get(
-            f"{WEBFLOW_BASE}/collections/{collection_id}/items",
-            headers=_headers(api_key),
-            params={"limit": 100},
-        )
-        resp.raise_for_status()
-        items = resp.json().get("items", [])
-
     cutoff = datetime.now(timezone.utc) - timedelta(days=days)
-
-    published: list[dict] = []
-    for item in items:
-        if item.get("isArchived", False) or item.get("isDraft", False):
-            continue
-
-        # Use publish-date field first, fall back to item-level createdOn
-        fd = item.get("fieldData") or {}
-        raw_date = fd.get("publish-date") or item.get("createdOn", "")
-        if raw_date:
-            try:
-                item_dt = datetime.fromisoformat(str(raw_date).rstrip("Z")).replace(tzinfo=timezone.utc)
-                if item_dt < cutoff:
-                    continue
-            except (ValueError, AttributeError):
-                pass  # unparseable date — include the item
-
-        published.append(item)
+    if incremental:
+        await webflow_store.sync_collection(api_key, collection_id, "publish-date", client)
+        return await webflow_store.query_items(collection_id, cutoff, featured_first), site_domain
+
+    pages = iter_collection_pages(
+        api_key, collection_id, client, stop_before=cutoff if early_stop else None,
+    )
+    published = await _collect_published(pages, "publish-date", cutoff)
 
     # Featured posts first when requested
     if featured_first:
@@ -0,0 +1,142 @@
+"""Local SQLite mirror of Webflow CMS collections, kept current by delta sync."""
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from contextlib import closing
+from datetime import datetime
+from typing import Optional
+
+import httpx
+
+from agent.sources.singleflight import SingleFlight
+from agent.storage import SqliteStore
+
+# A full resync (which also drops items deleted upstream) runs at least this often.
+FULL_RESYNC_INTERVAL = 24 * 3600  # seconds
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    collection_id TEXT    NOT NULL,
+    item_id       TEXT    NOT NULL,
+    last_updated  TEXT,
+    item_date     TEXT,
+    is_live       INTEGER NOT NULL,
+    featured      INTEGER NOT NULL,
+    data          TEXT    NOT NULL,
+    PRIMARY KEY (collection_id, item_id)
+);
+CREATE INDEX IF NOT EXISTS items_by_date ON items (collection_id, is_live, item_date);
+CREATE TABLE IF NOT EXISTS sync_state (
+    collection_id  TEXT PRIMARY KEY,
+    high_water     TEXT,
+    full_synced_at REAL
+);
+"""
+
+_store = SqliteStore("webflow.sqlite3", _SCHEMA)
+_sync_flight = SingleFlight()
+
+
+def _row(collection_id: str, item: dict, date_field: str) -> tuple:
+    # Local import: webflow.py imports this module at load time.
+    from agent.sources.webflow import _parse_dt
+
+    fd = item.get("fieldData") or {}
+    item_dt = _parse_dt(fd.get(date_field) or item.get("createdOn", ""))
+    return (
+        collection_id,
+        item["id"],
+        item.get("lastUpdated"),
+        item_dt.isoformat() if item_dt else None,  # NULL = no usable date, always included
+        int(not (item.get("isArchived", False) or item.get("isDraft", False))),
+        int(bool(fd.get("featured"))),
+        json.dumps(item),
+    )
+
+
+def _state(collection_id: str) -> tuple[Optional[str], float]:
+    with closing(_store.connect()) as conn:
+        row = conn.execute(
+            "SELECT high_water, full_synced_at FROM sync_state WHERE collection_id = ?",
+            (collection_id,),
+        ).fetchone()
+    return (row[0], row[1] or 0.0) if row else (None, 0.0)
+
+
+def _merge(collection_id: str, items: list[dict], date_field: str, full: bool) -> None:
+    rows = [_row(collection_id, item, date_field) for item in items if item.get("id")]
+    prev_hw, prev_full = (None, 0.0) if full else _state(collection_id)
+    stamps = [r[2] for r in rows if r[2]] + ([prev_hw] if prev_hw else [])
+    high_water = max(stamps, default=None)
+    with closing(_store.connect()) as conn, conn:
+        if full:
+            conn.execute("DELETE FROM items WHERE collection_id = ?", (collection_id,))
+        conn.executemany(
+            "INSERT OR REPLACE INTO items VALUES (?, ?, ?, ?, ?, ?, ?)", rows,
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)",
+            (collection_id, high_water, time.time() if full else prev_full),
+        )
+
+
+async def sync_collection(
+    api_key: str, collection_id: str, date_field: str,
+    client: Optional[httpx.AsyncClient] = None,
+    full: bool = False,
+) -> int:
+    """
+    Bring the local copy of a collection up to date. Returns items merged.
+
+    Incremental syncs page newest-first by lastPublished (Webflow cannot sort
+    by lastUpdated) and stop once a page was last published before the
+    stored lastUpdated high-water mark; items updated past it are merged.
+    Edits that were not published (e.g. archiving) wait for the next full
+    resync. The first sync, an
+    explicit `full`, or one older than FULL_RESYNC_INTERVAL rewrites the
+    collection so upstream deletions are dropped too.
+    """
+    from agent.sources.webflow import _parse_dt, iter_collection_pages
+
+    async def _sync() -> int:
+        high_water, full_synced_at = await asyncio.to_thread(_state, collection_id)
+        do_full = full or high_water is None or time.time() - full_synced_at > FULL_RESYNC_INTERVAL
+        stop_before = None if do_full else _parse_dt(high_water)
+
+        items: list[dict] = []
+        async for _, page in iter_collection_pages(
+            api_key, collection_id, client,
+            stop_before=stop_before,
+        ):
+            items.extend(
+                page if do_full else
+                [i for i in page if (i.get("lastUpdated") or "") > high_water]
+            )
+
+        await asyncio.to_thread(_merge, collection_id, items, date_field, do_full)
+        return len(items)
+
+    return await _sync_flight.do(collection_id, _sync)
+
+
+def _query(collection_id: str, cutoff: datetime, featured_first: bool, limit: int) -> list[dict]:
+    order = "featured DESC, " if featured_first else ""
+    with closing(_store.connect()) as conn:
+        rows = conn.execute(
+            "SELECT data FROM items"
+            " WHERE collection_id = ? AND is_live = 1"
+            " AND (item_date IS NULL OR item_date >= ?)"
+            f" ORDER BY {order}item_date IS NULL, item_date DESC"
+            " LIMIT ?",
+            (collection_id, cutoff.isoformat(), limit),
+        ).fetchall()
+    return [json.loads(r[0]) for r in rows]
+
+
+async def query_items(
+    collection_id: str, cutoff: datetime, featured_first: bool = True, limit: int = 10,
+) -> list[dict]:
+    """Live items dated on/after `cutoff`, newest first, from the indexed local table."""
+    return await asyncio.to_thread(_query, collection_id, cutoff, featured_first, limit)
@@ -0,0 +1,54 @@
+"""Shared plumbing for the local SQLite stores and in-process counters."""
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict
+
+CACHE_DIR = Path(os.getenv("COSN_CACHE_DIR", ".cache"))
+
+
+class SqliteStore:
+    """One SQLite file under the cache directory, created with `schema` on first use."""
+
+    def __init__(self, filename: str, schema: str) -> None:
+        self.path = CACHE_DIR / filename
+        self.schema = schema
+
+    def connect(self) -> sqlite3.Connection:
+        """A new connection; callers close it (contextlib.closing)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.executescript(self.schema)
+        return conn
+
+    def clear(self) -> None:
+        """Delete the file; the next connect() starts empty."""
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+
+
+class Counters:
+    """Thread-safe named counters for a module's *_stats() report."""
+
+    def __init__(self, *names: str) -> None:
+        self._values: Dict[str, float] = dict.fromkeys(names, 0)
+        self._lock = threading.Lock()
+
+    def bump(self, **deltas: float) -> None:
+        with self._lock:
+            for k, v in deltas.items():
+                self._values[k] += v
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def reset(self) -> None:
+        with self._lock:
+            for k in self._values:
+                self._values[k] = 0
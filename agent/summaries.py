@@ -0,0 +1,171 @@
+"""Per-document summaries — long context docs are condensed once and reused by every task."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+from typing import Any, Dict, Optional, Tuple
+
+from agent.budget import estimate_tokens
+from agent.storage import Counters, SqliteStore
+
+# Defaults for tasks in "summarize once" mode (task["doc_summaries"]); a task
+# may override both with task["summary_model"] / task["summary_tokens"].
+DEFAULT_SUMMARY_MODEL = os.getenv("COSN_SUMMARY_MODEL", "claude-haiku-4-5-20251001")
+DEFAULT_SUMMARY_TOKENS = int(os.getenv("COSN_SUMMARY_TOKENS", "800"))
+
+# Documents shorter than this are sent as they are.
+SUMMARY_MIN_TOKENS = 2_000
+
+# Bump when SUMMARY_PROMPT changes so old summaries are not reused.
+PROMPT_VERSION = 1
+
+SUMMARY_PROMPT = """\
+Summarize the document below for a content writer who will use it as \
+background when drafting newsletters and posts. Keep every concrete fact a \
+writer could cite — names, dates, numbers, links, programs, policies and \
+recurring formats — and drop repetition and filler. Use short headed \
+sections with bullet points. Stay under about {words} words and add nothing \
+that is not in the document.
+
+=== DOCUMENT: {name} ===
+
+{text}\
+"""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS summaries (
+    key        TEXT    PRIMARY KEY,
+    model      TEXT    NOT NULL,
+    summary    TEXT    NOT NULL,
+    created_at REAL    NOT NULL,
+    used_at    REAL    NOT NULL
+);
+"""
+
+_store = SqliteStore("summaries.sqlite3", _SCHEMA)
+_counters = Counters("hits", "misses", "failures")
+
+# Summaries being generated, so concurrent runs sharing a file make one
+# request. Agent loop only.
+_inflight: Dict[str, asyncio.Future] = {}
+
+
+def summary_key(text: str, model: str, max_tokens: int) -> str:
+    """Hash of the document text and everything that shapes its summary."""
+    digest = hashlib.sha256(text.encode()).hexdigest()
+    raw = json.dumps([digest, model, max_tokens, PROMPT_VERSION])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def lookup(key: str) -> Optional[str]:
+    try:
+        with closing(_store.connect()) as conn, conn:
+            row = conn.execute("SELECT summary FROM summaries WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                conn.execute("UPDATE summaries SET used_at = ? WHERE key = ?", (time.time(), key))
+    except sqlite3.Error:
+        return None
+    return row[0] if row else None
+
+
+def store(key: str, model: str, summary: str) -> None:
+    now = time.time()
+    try:
+        with closing(_store.connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?, ?)",
+                (key, model, summary, now, now),
+            )
+    except sqlite3.Error:
+        pass
+
+
+async def _generate(
+    key: str, api_key: str, name: str, text: str, model: str, max_tokens: int,
+) -> str:
+    from agent import claude
+
+    prompt = SUMMARY_PROMPT.format(words=int(max_tokens * 0.75), name=name, text=text)
+    summary, _ = await claude.agenerate(api_key, prompt, model=model, max_tokens=max_tokens)
+    summary = summary.strip()
+    await asyncio.to_thread(store, key, model, summary)
+    return summary
+
+
+async def summarize(
+    api_key: str, name: str, text: str,
+    model: str = DEFAULT_SUMMARY_MODEL, max_tokens: int = DEFAULT_SUMMARY_TOKENS,
+) -> Tuple[str, bool]:
+    """
+    The summary of `text` — (summary, reused), generated on first sight of
+    this text/model/length and read from the store afterwards.
+    Must be called on the agent loop.
+    """
+    key = summary_key(text, model, max_tokens)
+    cached = await asyncio.to_thread(lookup, key)
+    if cached is not None:
+        _counters.bump(hits=1)
+        return cached, True
+
+    fut = _inflight.get(key)
+    if fut is None:
+        _counters.bump(misses=1)
+        fut = _inflight[key] = asyncio.ensure_future(
+            _generate(key, api_key, name, text, model, max_tokens)
+        )
+        fut.add_done_callback(lambda _: _inflight.pop(key, None))
+        return await asyncio.shield(fut), False
+    return await asyncio.shield(fut), True
+
+
+async def summarize_docs(
+    api_key: str, docs: Dict[str, str],
+    model: Optional[str] = None, max_tokens: Optional[int] = None,
+) -> Tuple[Dict[str, str], Dict[str, Any]]:
+    """
+    Replace every document of at least SUMMARY_MIN_TOKENS with its summary.
+    A document whose summary fails is sent in full. Returns (docs, report).
+    """
+    model = model or DEFAULT_SUMMARY_MODEL
+    max_tokens = max_tokens or DEFAULT_SUMMARY_TOKENS
+    long_docs = [name for name, text in docs.items() if estimate_tokens(text) >= SUMMARY_MIN_TOKENS]
+    if not long_docs:
+        return docs, {}
+
+    results = await asyncio.gather(
+        *(summarize(api_key, name, docs[name], model, max_tokens) for name in long_docs),
+        return_exceptions=True,
+    )
+    out = dict(docs)
+    report: Dict[str, Any] = {}
+    for name, r in zip(long_docs, results):
+        entry: Dict[str, Any] = {"model": model, "tokens_before": estimate_tokens(docs[name])}
+        if isinstance(r, Exception):
+            _counters.bump(failures=1)
+            entry.update(tokens_after=entry["tokens_before"], error=str(r))
+        else:
+            out[name], entry["reused"] = r
+            entry["tokens_after"] = estimate_tokens(out[name])
+        report[name] = entry
+    return out, report
+
+
+def summary_cache_stats() -> Dict[str, Any]:
+    stats: Dict[str, Any] = _counters.snapshot()
+    try:
+        with closing(_store.connect()) as conn:
+            stats["entries"] = conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+    except sqlite3.Error:
+        stats["entries"] = 0
+    return stats
+
+
+def clear_summary_cache() -> None:
+    """Drop every stored summary and reset counters."""
+    _store.clear()
+    _counters.reset()
@@ -18,6 +18,13 @@ INTERVAL_PRESETS: Dict[str, int] = {
     "24 hours": 86400,
 }
 
+# Draft-reuse policies (agent.generation_cache) by UI label.
+REUSE_OPTIONS: Dict[str, str] = {
+    "Never — always regenerate": "always",
+    "When inputs are identical": "identical",
+    "Within a time window":      "ttl",
+}
+
 
 def fmt_interval(seconds: int) -> str:
     if seconds < 3600:
@@ -52,9 +59,63 @@ def new_task(
     webflow_blogs_enabled: bool = False,
     webflow_blogs_days: int = 7,
     webflow_blogs_featured_first: bool = True,
+    webflow_jobs_incremental: bool = False,
+    webflow_blogs_incremental: bool = False,
     template: Optional[Dict[str, Any]] = None,
     context_docs: Optional[List[Dict[str, Any]]] = None,
+    extra_sources: Optional[Dict[str, Dict[str, Any]]] = None,
+    generation_cache: str = "identical",
+    generation_cache_ttl: int = 3600,
+    skip_unchanged: bool = False,
+    input_token_budget: int = 150_000,
+    doc_retrieval: bool = True,
+    doc_summaries: bool = False,
+    summary_model: Optional[str] = None,
+    summary_tokens: Optional[int] = None,
+    section_mode: bool = False,
+    section_consistency: bool = False,
 ) -> Dict[str, Any]:
+    """
+    generation_cache: "always" regenerates, "identical" reuses the stored
+                   draft for identical inputs, "ttl" reuses it only within
+                   generation_cache_ttl seconds (agent.generation_cache).
+    skip_unchanged: scheduled runs end before generating when no source,
+                   file, instruction or model changed since the last draft.
+    input_token_budget: cap on prompt tokens; live data and then documents
+                   are trimmed to fit (agent.budget).
+    doc_retrieval: send large context docs as their chunks most relevant to
+                   the template and instructions (agent.retrieval).
+    doc_summaries: send long context docs as a summary made once per file
+                   content and reused by every task (agent.summaries);
+                   summary_model / summary_tokens override the defaults.
+    section_mode:  draft each top-level template section concurrently and
+                   stitch them in order (agent.template_sections);
+                   section_consistency adds a final editing pass.
+    extra_sources: {source name: config overrides} for plugin sources in
+                   agent.sources.registry, e.g. {"my_source": {"enabled": True}}.
+    """
+    from agent.sources.registry import default_sources
+
+    # Every registered source gets an entry (disabled by default), then the
+    # built-ins are filled from the explicit arguments.
+    sources = default_sources()
+    sources["luma"].update(enabled=luma_enabled, days=luma_days)
+    sources["spotify"].update(enabled=spotify_enabled, days=spotify_days)
+    sources["webflow"].update(
+        enabled=webflow_enabled,
+        days=webflow_jobs_days,
+        featured_first=webflow_jobs_featured_first,
+        incremental=webflow_jobs_incremental,   # delta-sync into local store
+    )
+    sources["webflow_blogs"].update(
+        enabled=webflow_blogs_enabled,
+        days=webflow_blogs_days,
+        featured_first=webflow_blogs_featured_first,
+        incremental=webflow_blogs_incremental,
+    )
+    for source_name, overrides in (extra_sources or {}).items():
+        sources.setdefault(source_name, {"enabled": False}).update(overrides)
+
     return {
         "id":           str(uuid.uuid4()),
         "name":         name,
@@ -62,28 +123,26 @@ def new_task(
         "interval":     max(interval, MIN_INTERVAL),
         "model":        model,
         "created_at":   datetime.now(timezone.utc).isoformat(),
-        "sources": {
-            "luma":          {"enabled": luma_enabled,    "days": luma_days},
-            "spotify":       {"enabled": spotify_enabled, "days": spotify_days},
-            "webflow":       {
-                "enabled":        webflow_enabled,
-                "days":           webflow_jobs_days,
-                "featured_first": webflow_jobs_featured_first,
-            },
-            "webflow_blogs": {
-                "enabled":        webflow_blogs_enabled,
-                "days":           webflow_blogs_days,
-                "featured_first": webflow_blogs_featured_first,
-            },
-        },
+        "sources":      sources,
         "template":     template,      # {"name": str, "bytes": bytes} | None
         "context_docs": context_docs,  # [{"name": str, "bytes": bytes}]
+        "generation_cache":     generation_cache,
+        "generation_cache_ttl": generation_cache_ttl,
+        "skip_unchanged":       skip_unchanged,
+        "input_token_budget":   input_token_budget,
+        "doc_retrieval":        doc_retrieval,
+        "doc_summaries":        doc_summaries,
+        "summary_model":        summary_model,
+        "summary_tokens":       summary_tokens,
+        "section_mode":         section_mode,
+        "section_consistency":  section_consistency,
         "enabled":    True,
-        "status":     "idle",          # idle | running | done | error
+        "status":     "idle",          # idle | running | done | unchanged | error
         "last_run":   None,
         "next_run":   None,
         "last_error": "",
         "outputs":    [],              # newest first, max 5
+        "unchanged_runs": 0,           # scheduled runs skipped since the last draft
     }
 
 
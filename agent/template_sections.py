@@ -0,0 +1,209 @@
+"""Section-parallel drafting — one request per template section over a shared cached prefix."""
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Concurrent section requests per run, and each section's output cap.
+SECTION_CONCURRENCY = int(os.getenv("COSN_SECTION_CONCURRENCY", "6"))
+SECTION_MAX_TOKENS = 2048
+
+# Templates must split into at least MIN_SECTIONS to be drafted in parallel;
+# past MAX_SECTIONS the run falls back to one request.
+MIN_SECTIONS = 2
+MAX_SECTIONS = 12
+
+# Replaces context.TASK_INSTRUCTION at the end of the shared prefix.
+SECTIONED_TASK_INSTRUCTION = """\
+Using the data above and following the template exactly, you will write the \
+content draft one section at a time, as asked below. Output should be ready \
+to copy into the final document with no further editing needed.\
+"""
+
+SECTION_INSTRUCTION = """\
+Write ONLY section {number} of {count}: "{title}". Start with its heading \
+exactly as written in the template and stop at the end of the section — no \
+other sections, introduction or sign-off unless the template puts them in \
+this section.
+
+Sections in order: {outline}
+
+=== THIS SECTION'S TEMPLATE ===
+{template}\
+"""
+
+CONSISTENCY_INSTRUCTION = """\
+The draft below was written section by section in parallel. Edit it into one \
+consistent piece: remove repetition across sections, unify tone, terminology \
+and formatting, and smooth transitions. Keep the template's structure and \
+every fact; add nothing new. Output the full revised draft only.
+
+=== DRAFT ===
+{draft}\
+"""
+
+_MD_HEADING = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+
+
+@dataclass
+class TemplateSection:
+    title: str
+    text: str  # the section's part of the template, heading included
+
+
+def _caps_heading(line: str) -> bool:
+    """A short ALL-CAPS line — how headings come out of .docx templates."""
+    s = line.strip()
+    letters = sum(c.isalpha() for c in s)
+    return letters >= 3 and len(s) <= 60 and s.upper() == s and not s.endswith(".")
+
+
+def _split(lines: List[str], is_heading: Callable[[str], bool], title: Callable[[str], str]) -> List[TemplateSection]:
+    sections: List[TemplateSection] = []
+    for line in lines:
+        if is_heading(line):
+            sections.append(TemplateSection(title(line), line))
+        elif sections:
+            sections[-1].text += "\n" + line
+    for s in sections:
+        s.text = s.text.strip()
+    return sections
+
+
+def parse_template(template_text: str) -> List[TemplateSection]:
+    """
+    Split a template into its top-level sections: the shallowest markdown
+    heading level used at least twice, else ALL-CAPS heading lines. Text
+    before the first heading stays in the shared template only.
+    Returns [] when the template does not split into MIN_SECTIONS..MAX_SECTIONS.
+    """
+    lines = template_text.splitlines()
+    levels = [len(m.group(1)) for m in map(_MD_HEADING.match, lines) if m]
+    sections: List[TemplateSection] = []
+    for level in sorted(set(levels)):
+        if levels.count(level) >= MIN_SECTIONS:
+            marker = re.compile(rf"^#{{{level}}}\s")
+            sections = _split(lines, marker.match, lambda l: _MD_HEADING.match(l).group(2))
+            break
+    if not sections:
+        sections = _split(lines, _caps_heading, str.strip)
+    return sections if MIN_SECTIONS <= len(sections) <= MAX_SECTIONS else []
+
+
+def shared_prefix(blocks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """The run's context blocks with the last one also marked for prompt caching."""
+    prefix = [dict(b) for b in blocks]
+    prefix[-1]["cache_control"] = {"type": "ephemeral"}
+    return prefix
+
+
+def section_blocks(
+    prefix: List[Dict[str, Any]], outline: List[TemplateSection], index: int,
+) -> List[Dict[str, Any]]:
+    section = outline[index]
+    instruction = SECTION_INSTRUCTION.format(
+        number=index + 1, count=len(outline), title=section.title,
+        outline=" → ".join(s.title for s in outline), template=section.text,
+    )
+    return prefix + [{"type": "text", "text": instruction}]
+
+
+def _add_usage(total: Dict[str, int], usage: Dict[str, int]) -> None:
+    for k, v in usage.items():
+        total[k] = total.get(k, 0) + v
+
+
+async def agenerate_sections(
+    api_key: str,
+    blocks: List[Dict[str, Any]],
+    outline: List[TemplateSection],
+    model: str,
+    on_text: Optional[Callable[[str], None]] = None,
+    consistency: bool = False,
+) -> Tuple[str, Dict[str, int], Dict[str, Any]]:
+    """
+    Draft every section of `outline` concurrently and stitch them in order.
+    Returns (text, summed token usage, report).
+
+    The first section is sent alone until its first token arrives — by then
+    the shared prefix is in the prompt cache, so the remaining sections read
+    it instead of each writing it. on_text receives the stitched draft in
+    order: the first section as it streams, later ones as each completes
+    behind it — the stitched text is exactly what was passed. consistency:
+    one more request edits the stitched draft into a single voice (not
+    streamed; the result replaces the stitched draft).
+    """
+    from agent import claude
+
+    n = len(outline)
+    prefix = shared_prefix(blocks)
+    texts: List[Optional[str]] = [None] * n
+    timings: List[float] = [0.0] * n
+    usage: Dict[str, int] = {}
+    published = 1  # section 0 is published as it streams
+    semaphore = asyncio.Semaphore(SECTION_CONCURRENCY)
+    first_token = asyncio.Event()
+
+    def on_first(text: str) -> None:
+        first_token.set()
+        if on_text:
+            on_text(text)
+
+    def flush() -> None:
+        nonlocal published
+        if texts[0] is None:
+            return
+        while published < n and texts[published] is not None:
+            if on_text:
+                on_text("\n\n" + texts[published])
+            published += 1
+
+    async def draft(i: int, stream: Optional[Callable[[str], None]] = None) -> None:
+        async with semaphore:
+            started = time.monotonic()
+            text, u = await claude.agenerate(
+                api_key, section_blocks(prefix, outline, i),
+                model=model, max_tokens=SECTION_MAX_TOKENS, on_text=stream,
+            )
+            timings[i] = round(time.monotonic() - started, 2)
+        # The first section is kept exactly as streamed so the stitched draft
+        # extends what pollers have already received.
+        texts[i] = text if stream else text.strip()
+        _add_usage(usage, u)
+        flush()
+
+    first = asyncio.ensure_future(draft(0, on_first))
+    warm = asyncio.ensure_future(first_token.wait())
+    tasks = [first]
+    try:
+        await asyncio.wait({first, warm}, return_when=asyncio.FIRST_COMPLETED)
+        tasks += [asyncio.ensure_future(draft(i)) for i in range(1, n)]
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for t in tasks:
+            t.cancel()
+        raise
+    finally:
+        warm.cancel()
+
+    full_text = "\n\n".join(texts)  # type: ignore[arg-type]
+    report: Dict[str, Any] = {
+        "count":            n,
+        "titles":           [s.title for s in outline],
+        "section_s":        timings,
+        "consistency_pass": consistency,
+    }
+    if consistency:
+        started = time.monotonic()
+        full_text, u = await claude.agenerate(
+            api_key, prefix + [{"type": "text", "text": CONSISTENCY_INSTRUCTION.format(draft=full_text)}],
+            model=model, max_tokens=min(n * SECTION_MAX_TOKENS, 16_000),
+        )
+        _add_usage(usage, u)
+        report["consistency_s"] = round(time.monotonic() - started, 2)
+    usage["requests"] = n + (1 if consistency else 0)
+    return full_text, usage, report
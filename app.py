@@ -23,12 +23,16 @@ st.set_page_config(
 )
 
 from ui.styles import inject_styles
-from agent.task import new_task, schedule_next, fmt_interval, fmt_dt, INTERVAL_PRESETS
+from agent.task import new_task, schedule_next, fmt_interval, fmt_dt, INTERVAL_PRESETS, REUSE_OPTIONS
 from agent.runner import submit_task
 from agent.claude import AVAILABLE_MODELS
+from agent.summaries import DEFAULT_SUMMARY_MODEL, DEFAULT_SUMMARY_TOKENS
+from agent.sources.registry import all_sources
+from agent.procpool import warm_up
 from scheduler import scheduler_fragment
 
 inject_styles()
+warm_up()  # start extraction/render workers once per server process
 
 # ── Session state ─────────────────────────────────────────────────────────────
 if "tasks" not in st.session_state:
@@ -97,14 +101,18 @@ def create_task_dialog() -> None:
         if wf_en:
             wf_days           = st.slider("Look-back (days)", 1, 30, 7, key="d_wf")
             wf_featured_first = st.checkbox("Featured first?", value=True, key="wf_feat")
+            wf_incremental    = st.checkbox("Incremental sync", value=False, key="wf_inc",
+                                            help="Mirror the collection locally and fetch only changed items.")
         else:
-            wf_days, wf_featured_first = 7, True
+            wf_days, wf_featured_first, wf_incremental = 7, True, False
         wf_blog_en= st.checkbox("📰 Webflow Blogs",     value=False)
         if wf_blog_en:
             wf_blog_days           = st.slider("Look-back (days)", 1, 30, 7, key="d_wf_blog")
             wf_blog_featured_first = st.checkbox("Featured first?", value=True, key="wf_blog_feat")
+            wf_blog_incremental    = st.checkbox("Incremental sync", value=False, key="wf_blog_inc",
+                                                 help="Mirror the collection locally and fetch only changed items.")
         else:
-            wf_blog_days, wf_blog_featured_first = 7, True
+            wf_blog_days, wf_blog_featured_first, wf_blog_incremental = 7, True, False
 
     with col_sched:
         st.markdown("**Schedule & Model**")
@@ -115,6 +123,35 @@ def create_task_dialog() -> None:
             interval = INTERVAL_PRESETS[preset]
         st.caption(f"Repeats every **{fmt_interval(int(interval))}**")
         model    = st.selectbox("Claude model", AVAILABLE_MODELS)
+        reuse    = st.selectbox("Reuse drafts", list(REUSE_OPTIONS), index=1,
+                                help="Skip Claude when the assembled context is identical to an earlier run.")
+        reuse_ttl = st.number_input("Reuse within (minutes)", min_value=1, value=60, step=5) \
+            if REUSE_OPTIONS[reuse] == "ttl" else 60
+        skip_unchanged = st.checkbox("Only run when inputs change", value=False,
+                                     help="Scheduled runs stop before generating if no source, file or setting changed.")
+        doc_retrieval = st.checkbox("Send only relevant parts of large docs", value=True,
+                                    help="Large context docs are searched locally and only the best-matching passages are sent.")
+        doc_summaries = st.checkbox("Summarize long docs once", value=False,
+                                    help="Long context docs are condensed by Claude the first time a file is seen; "
+                                         "every later run of any task reuses the stored summary.")
+        if doc_summaries:
+            summary_model = st.selectbox(
+                "Summary model", AVAILABLE_MODELS,
+                index=AVAILABLE_MODELS.index(DEFAULT_SUMMARY_MODEL) if DEFAULT_SUMMARY_MODEL in AVAILABLE_MODELS else 0,
+            )
+            summary_tokens = st.number_input("Summary length (tokens)", min_value=100, max_value=4_000,
+                                             value=DEFAULT_SUMMARY_TOKENS, step=100)
+        else:
+            summary_model, summary_tokens = DEFAULT_SUMMARY_MODEL, DEFAULT_SUMMARY_TOKENS
+        section_mode = st.checkbox("Draft template sections in parallel", value=False,
+                                   help="Each top-level section of the template is written by its own request at the "
+                                        "same time, then stitched in order — faster for long templates.")
+        section_consistency = st.checkbox("Finish with a consistency pass", value=False,
+                                          disabled=not section_mode,
+                                          help="One more request edits the stitched draft into a single voice.")
+        token_budget = st.number_input("Input token budget", min_value=1_000, max_value=190_000,
+                                       value=150_000, step=5_000,
+                                       help="Live data, then context docs, are trimmed to keep the prompt under this.")
         run_now  = st.checkbox("Run immediately on create", value=True)
 
     st.divider()
@@ -146,12 +183,24 @@ def create_task_dialog() -> None:
             webflow_blogs_enabled=wf_blog_en,
             webflow_blogs_days=wf_blog_days,
             webflow_blogs_featured_first=wf_blog_featured_first,
+            webflow_jobs_incremental=wf_incremental,
+            webflow_blogs_incremental=wf_blog_incremental,
             template=template,
             context_docs=docs,
+            generation_cache=REUSE_OPTIONS[reuse],
+            generation_cache_ttl=int(reuse_ttl) * 60,
+            skip_unchanged=skip_unchanged,
+            input_token_budget=int(token_budget),
+            doc_retrieval=doc_retrieval,
+            doc_summaries=doc_summaries,
+            summary_model=summary_model,
+            summary_tokens=int(summary_tokens),
+            section_mode=section_mode,
+            section_consistency=section_mode and section_consistency,
         )
 
         if run_now:
-            submit_task(task, api_config)
+            submit_task(task, api_config, manual=True)
             task["status"] = "running"
 
         schedule_next(task)
@@ -194,18 +243,15 @@ else:
 
     for task in tasks:
         src_icons = "  ".join([
-            icon for flag, icon in [
-                (task["sources"]["luma"]["enabled"],                          "📅"),
-                (task["sources"]["spotify"]["enabled"],                       "🎙️"),
-                (task["sources"]["webflow"]["enabled"],                       "💼"),
-                (task["sources"].get("webflow_blogs", {}).get("enabled"),     "📰"),
-            ] if flag
+            source.icon for source in all_sources()
+            if task["sources"].get(source.name, {}).get("enabled")
         ]) or "—"
 
         status_display = {
             "idle":    "○ Idle",
             "running": "🔄 Running",
             "done":    "✅ Done",
+            "unchanged": "＝ No change",
             "error":   "❌ Error",
         }.get(task["status"], "—")
 
@@ -226,7 +272,7 @@ else:
 
             if a1.button("▶", key=f"run_{task['id']}", help="Run now",
                          disabled=(task["status"] == "running")):
-                submit_task(task, api_config)
+                submit_task(task, api_config, manual=True)
                 task["status"] = "running"
                 schedule_next(task)
                 st.rerun()
@@ -1,9 +1,8 @@
-import os
-import anthropic
+from clients import get_anthropic_client
 
 
 def generate_newsletter(context: str) -> str:
-    client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+    client = get_anthropic_client()
 
     system_prompt = (
         "You are a professional content writer for the Chief of Staff Network (CoSN), "
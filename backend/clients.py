@@ -0,0 +1,66 @@
+import os
+import threading
+import time
+
+import anthropic
+import httpx
+
+# Pool settings, overridable from the environment.
+MAX_CONNECTIONS = int(os.getenv("ANTHROPIC_MAX_CONNECTIONS", "10"))
+MAX_KEEPALIVE = int(os.getenv("ANTHROPIC_MAX_KEEPALIVE", "5"))
+TIMEOUT = float(os.getenv("ANTHROPIC_TIMEOUT", "600"))
+CONNECT_TIMEOUT = float(os.getenv("ANTHROPIC_CONNECT_TIMEOUT", "5"))
+
+# {api_key: Anthropic} — one keep-alive pool per key for the whole process.
+_clients = {}
+_stats = {"requests": 0, "connections_opened": 0, "latency_s": 0.0}
+_lock = threading.Lock()
+
+
+def _trace(event, info):
+    if event == "connection.connect_tcp.complete":
+        with _lock:
+            _stats["connections_opened"] += 1
+
+
+def _on_request(request):
+    request.extensions["trace"] = _trace
+    # Kept on the request itself, so failed requests leave nothing behind.
+    request.extensions["sent_at"] = time.monotonic()
+
+
+def _on_response(response):
+    started = response.request.extensions.get("sent_at")
+    with _lock:
+        if started is not None:
+            _stats["requests"] += 1
+            _stats["latency_s"] += time.monotonic() - started
+
+
+def get_anthropic_client(api_key: str = None) -> anthropic.Anthropic:
+    api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
+    with _lock:
+        client = _clients.get(api_key)
+        if client is None or client.is_closed():
+            client = _clients[api_key] = anthropic.Anthropic(
+                api_key=api_key,
+                http_client=anthropic.DefaultHttpxClient(
+                    limits=httpx.Limits(
+                        max_connections=MAX_CONNECTIONS,
+                        max_keepalive_connections=MAX_KEEPALIVE,
+                    ),
+                    timeout=httpx.Timeout(TIMEOUT, connect=CONNECT_TIMEOUT),
+                    event_hooks={"request": [_on_request], "response": [_on_response]},
+                ),
+            )
+        return client
+
+
+def anthropic_pool_stats() -> dict:
+    with _lock:
+        s = dict(_stats)
+    n = s["requests"]
+    s["reused"] = max(0, n - s["connections_opened"])
+    s["reuse_ratio"] = round(s["reused"] / n, 3) if n else 0.0
+    s["avg_latency_s"] = round(s.pop("latency_s") / n, 3) if n else 0.0
+    return s
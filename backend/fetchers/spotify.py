@@ -1,27 +1,75 @@
 import os
+import threading
+import time
 import requests
 from datetime import datetime, timedelta, timezone
 
+# Refresh this many seconds before expires_in so no request races expiry.
+TOKEN_REFRESH_MARGIN = 300
+
+# {client_id: (access_token, monotonic refresh-at)}
+_tokens = {}
+_tokens_lock = threading.Lock()
+# One lock per client_id so concurrent requests share a single refresh.
+_refresh_locks = {}
+
+
+def _cached_token(client_id: str):
+    with _tokens_lock:
+        entry = _tokens.get(client_id)
+    if entry and time.monotonic() < entry[1]:
+        return entry[0]
+    return None
+
+
+def invalidate_access_token(client_id: str, token: str = None) -> None:
+    with _tokens_lock:
+        entry = _tokens.get(client_id)
+        if entry and (token is None or entry[0] == token):
+            del _tokens[client_id]
+
 
 def _get_access_token() -> str:
     client_id = os.getenv("SPOTIFY_CLIENT_ID")
     client_secret = os.getenv("SPOTIFY_CLIENT_SECRET")
-    resp = requests.post(
-        "https://accounts.spotify.com/api/token",
-        data={"grant_type": "client_credentials"},
-        auth=(client_id, client_secret),
-        timeout=10,
-    )
-    resp.raise_for_status()
-    return resp.json()["access_token"]
+
+    token = _cached_token(client_id)
+    if token:
+        return token
+
+    with _tokens_lock:
+        refresh_lock = _refresh_locks.setdefault(client_id, threading.Lock())
+    with refresh_lock:
+        # Another request may have refreshed while we waited for the lock.
+        token = _cached_token(client_id)
+        if token:
+            return token
+        resp = requests.post(
+            "https://accounts.spotify.com/api/token",
+            data={"grant_type": "client_credentials"},
+            auth=(client_id, client_secret),
+            timeout=10,
+        )
+        resp.raise_for_status()
+        payload = resp.json()
+        token = payload["access_token"]
+        ttl = max(0, int(payload.get("expires_in", 3600)) - TOKEN_REFRESH_MARGIN)
+        with _tokens_lock:
+            _tokens[client_id] = (token, time.monotonic() + ttl)
+        return token
 
 
 def fetch_spotify_episodes(show_id: str, days_back: int = 7) -> dict:
-    token = _get_access_token()
-    headers = {"Authorization": f"Bearer {token}"}
     url = f"https://api.spotify.com/v1/shows/{show_id}/episodes"
     params = {"limit": 10, "market": "US"}
-    resp = requests.get(url, headers=headers, params=params, timeout=10)
+
+    token = _get_access_token()
+    resp = requests.get(url, headers={"Authorization": f"Bearer {token}"}, params=params, timeout=10)
+    if resp.status_code == 401:
+        # Token revoked or expired early — drop it and retry once with a fresh one.
+        invalidate_access_token(os.getenv("SPOTIFY_CLIENT_ID"), token)
+        token = _get_access_token()
+        resp = requests.get(url, headers={"Authorization": f"Bearer {token}"}, params=params, timeout=10)
     resp.raise_for_status()
     data = resp.json()
 
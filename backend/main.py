@@ -15,6 +15,7 @@ from normalizers.spotify import normalize_spotify
 from normalizers.webflow import normalize_webflow
 from normalizers.assembler import assemble_context
 from agent import generate_newsletter
+from clients import anthropic_pool_stats, get_anthropic_client
 from output.docx_writer import write_docx
 
 app = FastAPI(title="CoSN Agent Dashboard API")
@@ -123,9 +124,7 @@ async def test_connection(service: str = Form(...)):
         elif service == "webflow":
             fetch_webflow_posts(days_back=30)
         elif service == "anthropic":
-            import anthropic
-            client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-            client.messages.create(
+            get_anthropic_client().messages.create(
                 model="claude-haiku-4-5-20251001",
                 max_tokens=10,
                 messages=[{"role": "user", "content": "ping"}],
@@ -137,6 +136,12 @@ async def test_connection(service: str = Form(...)):
         return {"ok": False, "message": str(e)}
 
 
+@app.get("/api/anthropic-pool")
+def get_anthropic_pool():
+    """Connection reuse and request latency of the shared Anthropic client."""
+    return anthropic_pool_stats()
+
+
 @app.get("/api/collections")
 def get_webflow_collections():
     """List Webflow collections for config UI."""
@@ -8,9 +8,12 @@ import streamlit as st
 from ui.styles import inject_styles
 from agent.task import (
     fmt_interval, fmt_dt, schedule_next,
-    INTERVAL_PRESETS, MIN_INTERVAL,
+    INTERVAL_PRESETS, MIN_INTERVAL, REUSE_OPTIONS,
 )
 from agent.claude import AVAILABLE_MODELS
+from agent.sources.registry import all_sources
+from agent.summaries import DEFAULT_SUMMARY_MODEL, DEFAULT_SUMMARY_TOKENS
+from agent.runner import forget_inputs, poll_partial
 
 st.set_page_config(page_title="Task Detail — CoSN Agent", page_icon="📋", layout="wide")
 inject_styles()
@@ -31,6 +34,8 @@ if task is None:
 
 # Map interval seconds → preset label (for pre-selecting the dropdown)
 _preset_by_val = {v: k for k, v in INTERVAL_PRESETS.items()}
+# Sources with dedicated controls in the edit dialog.
+_BUILTIN_SOURCES = ("luma", "spotify", "webflow", "webflow_blogs")
 
 
 @st.dialog("Edit Task", width="large")
@@ -61,18 +66,33 @@ def _edit_dialog(t: dict) -> None:
                                           src.get("webflow", {}).get("days", 7), key="e_wf_days")
             wf_featured_first = st.checkbox("Featured first?",
                                             value=src.get("webflow", {}).get("featured_first", True), key="e_wf_feat")
+            wf_incremental    = st.checkbox("Incremental sync",
+                                            value=src.get("webflow", {}).get("incremental", False), key="e_wf_inc")
         else:
             wf_days           = src.get("webflow", {}).get("days", 7)
             wf_featured_first = src.get("webflow", {}).get("featured_first", True)
+            wf_incremental    = src.get("webflow", {}).get("incremental", False)
         wf_blog_en= st.checkbox("📰 Webflow Blogs",  value=src.get("webflow_blogs", {}).get("enabled", False),  key="e_wf_blog_en")
         if wf_blog_en:
             wf_blog_days           = st.slider("Look-back (days)", 1, 30,
                                                src.get("webflow_blogs", {}).get("days", 7), key="e_wf_blog_days")
             wf_blog_featured_first = st.checkbox("Featured first?",
                                                  value=src.get("webflow_blogs", {}).get("featured_first", True), key="e_wf_blog_feat")
+            wf_blog_incremental    = st.checkbox("Incremental sync",
+                                                 value=src.get("webflow_blogs", {}).get("incremental", False), key="e_wf_blog_inc")
         else:
             wf_blog_days           = src.get("webflow_blogs", {}).get("days", 7)
             wf_blog_featured_first = src.get("webflow_blogs", {}).get("featured_first", True)
+            wf_blog_incremental    = src.get("webflow_blogs", {}).get("incremental", False)
+        # Plugin sources (agent.sources.registry) get an on/off switch; their
+        # other settings keep the task's values.
+        plugin_enabled = {
+            source.name: st.checkbox(
+                f"{source.icon} {source.label}".strip(),
+                value=src.get(source.name, {}).get("enabled", False), key=f"e_src_{source.name}",
+            )
+            for source in all_sources() if source.name not in _BUILTIN_SOURCES
+        }
 
     with col_sched:
         st.markdown("**Schedule & Model**")
@@ -98,6 +118,63 @@ def _edit_dialog(t: dict) -> None:
             index=AVAILABLE_MODELS.index(t["model"]) if t["model"] in AVAILABLE_MODELS else 0,
             key="e_model",
         )
+        reuse_labels = list(REUSE_OPTIONS)
+        reuse_values = list(REUSE_OPTIONS.values())
+        current_reuse = t.get("generation_cache", "identical")
+        reuse = st.selectbox(
+            "Reuse drafts",
+            reuse_labels,
+            index=reuse_values.index(current_reuse) if current_reuse in reuse_values else 1,
+            key="e_reuse",
+            help="Skip Claude when the assembled context is identical to an earlier run.",
+        )
+        if REUSE_OPTIONS[reuse] == "ttl":
+            reuse_ttl = st.number_input(
+                "Reuse within (minutes)", min_value=1,
+                value=t.get("generation_cache_ttl", 3600) // 60, step=5, key="e_reuse_ttl",
+            )
+        else:
+            reuse_ttl = t.get("generation_cache_ttl", 3600) // 60
+        skip_unchanged = st.checkbox(
+            "Only run when inputs change", value=t.get("skip_unchanged", False), key="e_skip_unchanged",
+            help="Scheduled runs stop before generating if no source, file or setting changed.",
+        )
+        doc_retrieval = st.checkbox(
+            "Send only relevant parts of large docs", value=t.get("doc_retrieval", True), key="e_doc_retrieval",
+            help="Large context docs are searched locally and only the best-matching passages are sent.",
+        )
+        doc_summaries = st.checkbox(
+            "Summarize long docs once", value=t.get("doc_summaries", False), key="e_doc_summaries",
+            help="Long context docs are condensed by Claude the first time a file is seen; "
+                 "every later run of any task reuses the stored summary.",
+        )
+        summary_model = t.get("summary_model") or DEFAULT_SUMMARY_MODEL
+        summary_tokens = t.get("summary_tokens") or DEFAULT_SUMMARY_TOKENS
+        if doc_summaries:
+            summary_model = st.selectbox(
+                "Summary model", AVAILABLE_MODELS,
+                index=AVAILABLE_MODELS.index(summary_model) if summary_model in AVAILABLE_MODELS else 0,
+                key="e_summary_model",
+            )
+            summary_tokens = st.number_input(
+                "Summary length (tokens)", min_value=100, max_value=4_000, step=100,
+                value=summary_tokens, key="e_summary_tokens",
+            )
+        section_mode = st.checkbox(
+            "Draft template sections in parallel", value=t.get("section_mode", False), key="e_section_mode",
+            help="Each top-level section of the template is written by its own request at the "
+                 "same time, then stitched in order — faster for long templates.",
+        )
+        section_consistency = st.checkbox(
+            "Finish with a consistency pass", value=t.get("section_consistency", False),
+            key="e_section_consistency", disabled=not section_mode,
+            help="One more request edits the stitched draft into a single voice.",
+        )
+        token_budget = st.number_input(
+            "Input token budget", min_value=1_000, max_value=190_000, step=5_000,
+            value=t.get("input_token_budget", 150_000), key="e_token_budget",
+            help="Live data, then context docs, are trimmed to keep the prompt under this.",
+        )
 
     st.write("")
     if st.button("Save Changes", type="primary", use_container_width=True):
@@ -113,10 +190,32 @@ def _edit_dialog(t: dict) -> None:
         t["instructions"] = instructions
         t["interval"]     = interval
         t["model"]        = model
-        t["sources"]["luma"]          = {"enabled": luma_en,    "days": luma_days}
-        t["sources"]["spotify"]       = {"enabled": sp_en,      "days": sp_days}
-        t["sources"]["webflow"]       = {"enabled": wf_en,       "days": wf_days,      "featured_first": wf_featured_first}
-        t["sources"]["webflow_blogs"] = {"enabled": wf_blog_en,  "days": wf_blog_days, "featured_first": wf_blog_featured_first}
+        t["generation_cache"]     = REUSE_OPTIONS[reuse]
+        t["generation_cache_ttl"] = int(reuse_ttl) * 60
+        t["skip_unchanged"]       = skip_unchanged
+        t["input_token_budget"]   = int(token_budget)
+        t["doc_retrieval"]        = doc_retrieval
+        t["doc_summaries"]        = doc_summaries
+        t["summary_model"]        = summary_model
+        t["summary_tokens"]       = int(summary_tokens)
+        t["section_mode"]         = section_mode
+        t["section_consistency"]  = section_mode and section_consistency
+        # Update in place so registry defaults and per-task overrides the
+        # dialog does not show (max_events, snapshot_window, …) survive.
+        edited = {
+            "luma":          {"enabled": luma_en,    "days": luma_days},
+            "spotify":       {"enabled": sp_en,      "days": sp_days},
+            "webflow":       {"enabled": wf_en,      "days": wf_days,      "featured_first": wf_featured_first,
+                              "incremental": wf_incremental},
+            "webflow_blogs": {"enabled": wf_blog_en, "days": wf_blog_days, "featured_first": wf_blog_featured_first,
+                              "incremental": wf_blog_incremental},
+            **{name: {"enabled": on} for name, on in plugin_enabled.items()},
+        }
+        for source_name, values in edited.items():
+            t["sources"].setdefault(source_name, {}).update(values)
+
+        # Edited settings always earn a fresh draft on the next run.
+        forget_inputs(t["id"])
 
         # Re-schedule if interval changed and task is active
         if interval_changed and t.get("enabled"):
@@ -152,10 +251,17 @@ status_display = {
     "idle":    "○ Idle",
     "running": "🔄 Running",
     "done":    "✅ Done",
+    "unchanged": "＝ No change",
     "error":   "❌ Error",
 }.get(task["status"], "—")
 
-meta_cols[0].metric("Status",   status_display)
+unchanged_runs = task.get("unchanged_runs", 0)
+meta_cols[0].metric(
+    "Status", status_display,
+    delta=f"{unchanged_runs} run{'s' if unchanged_runs != 1 else ''} with no change" if unchanged_runs else None,
+    delta_color="off",
+    help="Scheduled runs skipped since the last draft because no input changed.",
+)
 meta_cols[1].metric("Interval", fmt_interval(task["interval"]))
 meta_cols[2].metric("Last run", fmt_dt(task.get("last_run")))
 meta_cols[3].metric("Next run", fmt_dt(task.get("next_run")) if task["enabled"] else "Paused")
@@ -181,6 +287,35 @@ if task.get("instructions"):
 if task.get("last_error"):
     st.error(f"Last error: {task['last_error']}")
 
+# ── Live output ────────────────────────────────────────────────────────────────
+
+@st.fragment(run_every=1)
+def _live_output() -> None:
+    """Render the running draft progressively, fetching only the new text."""
+    live = st.session_state.setdefault(f"live_{task_id}", {"offset": 0, "text": ""})
+    update = poll_partial(task_id, live["offset"])
+    if update is None:
+        return
+    if update.get("reset"):
+        live["text"] = update["delta"]  # the final draft differs from what streamed
+    else:
+        live["text"] += update["delta"]
+    live["offset"] = update["offset"]
+    if update["status"] == "running":
+        st.caption("🔄 Generating…" if live["text"] else "🔄 Fetching sources…")
+    elif update["status"] == "done":
+        st.caption("✅ Finished — the run is saved on the next Dashboard refresh.")
+    if live["text"]:
+        st.markdown(live["text"])
+
+
+if task["status"] == "running":
+    st.divider()
+    st.subheader("Current run")
+    _live_output()
+else:
+    st.session_state.pop(f"live_{task_id}", None)
+
 # ── Runs / Outputs ─────────────────────────────────────────────────────────────
 
 st.divider()
@@ -200,6 +335,48 @@ else:
         with st.expander(f"Run #{run_num} · {ts}", expanded=(idx == 0)):
             if sources_used:
                 st.caption("Sources: " + " · ".join(sources_used))
+            usage = output.get("usage")
+            if usage:
+                st.caption(
+                    f"Tokens: {usage['input_tokens']:,} in · {usage['output_tokens']:,} out · "
+                    f"prompt cache {usage['cache_read_input_tokens']:,} read / "
+                    f"{usage['cache_creation_input_tokens']:,} written · {usage['generation_s']}s"
+                )
+
+            sections = output.get("sections")
+            if sections:
+                st.caption(
+                    f"Sections: {sections['count']} drafted in parallel · "
+                    f"slowest {max(sections['section_s'])}s"
+                    + (f" · consistency pass {sections['consistency_s']}s" if sections.get("consistency_s") else "")
+                )
+
+            plan = output.get("token_budget")
+            if plan:
+                trimmed = [s["section"] for s in plan["sections"] if s["action"] != "kept"]
+                st.caption(
+                    f"Context: ~{plan['estimated_total']:,} of {plan['budget']:,} tokens"
+                    + (f" · trimmed {', '.join(trimmed)}" if trimmed else "")
+                )
+                for doc_name, r in (output.get("doc_summaries") or {}).items():
+                    state = "summary failed, sent in full" if "error" in r else (
+                        "stored summary" if r.get("reused") else "new summary")
+                    st.caption(
+                        f"📝 {doc_name}: {state} · "
+                        f"~{r['tokens_before']:,} → {r['tokens_after']:,} tokens"
+                    )
+                for doc_name, r in (output.get("retrieval") or {}).items():
+                    st.caption(
+                        f"📎 {doc_name}: {r['selected']} of {r['chunks']} chunks · "
+                        f"~{r['tokens_before']:,} → {r['tokens_after']:,} tokens"
+                    )
+                # Expanders cannot nest, so a toggle gates the table.
+                if st.toggle("Token breakdown", key=f"tokens_{task_id}_{idx}"):
+                    st.table([
+                        {"Section": s["section"], "Tokens": s["tokens"],
+                         "Sent": s["kept_tokens"], "Action": s["action"]}
+                        for s in plan["sections"]
+                    ])
 
             st.markdown(output.get("text", "_(no output text)_"))
 
@@ -21,11 +21,17 @@ def scheduler_fragment() -> None:
     tasks = st.session_state.get("tasks", [])
     now = datetime.now(timezone.utc)
     changed = False
+    queued: list = []
+    batched: list = []
 
     for task in tasks:
         # ── Sync completed results ────────────────────────────────────────────
         if task["status"] == "running":
             result = poll_result(task["id"])
+            if result and result["status"] == "running" and result["queue"]["position"]:
+                queued.append(task["name"])
+            elif result and result["status"] == "running" and result.get("batch"):
+                batched.append(task["name"])
             if result and result["status"] != "running":
                 if result["status"] == "done":
                     task["status"] = "done"
@@ -37,8 +43,20 @@ def scheduler_fragment() -> None:
                         "docx_bytes":  result["docx_bytes"],
                         "model":       task["model"],
                         "sources_used": result.get("sources_used", []),
+                        "usage":       result.get("usage"),
+                        "token_budget": result.get("token_budget"),
+                        "retrieval":   result.get("retrieval"),
+                        "doc_summaries": result.get("doc_summaries"),
+                        "sections":    result.get("sections"),
                     })
                     task["outputs"] = task["outputs"][:5]  # keep last 5
+                    task["unchanged_runs"] = 0
+                elif result["status"] == "unchanged":
+                    # Inputs identical to the last draft — nothing new to store.
+                    task["status"] = "unchanged"
+                    task["last_run"] = now
+                    task["unchanged_runs"] = task.get("unchanged_runs", 0) + 1
+                    schedule_next(task, now)
                 else:
                     task["status"] = "error"
                     task["last_error"] = result.get("error", "Unknown error")
@@ -68,7 +86,13 @@ def scheduler_fragment() -> None:
     )
 
     if running:
-        st.caption(f"🔄 Running: {', '.join(running)}")
+        active = [name for name in running if name not in queued and name not in batched]
+        caption = f"🔄 Running: {', '.join(active) or '—'}"
+        if queued:
+            caption += f" · ⏳ Queued: {', '.join(queued)}"
+        if batched:
+            caption += f" · 📦 Batched: {', '.join(batched)}"
+        st.caption(caption)
     elif upcoming:
         secs = max(0, int((upcoming[0]["next_run"] - now).total_seconds()))
         m, s = divmod(secs, 60)